@@ -1,56 +1,112 @@
 import sys
-import pandas as pd
-import numpy as np
+import time
+
+STARTUP = time.perf_counter()
+
+from multiprocessing import freeze_support
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QStackedLayout, QPushButton
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QStackedLayout, QPushButton, QStatusBar
 )
 
-# Matplotlib embebido en Qt
-from components import RightPanel, UniformLeftPanel, NormalLeftPanel, ExponentialLeftPanel, Tab
+from instrumentation import INSTRUMENTATION, format_report
+from startup import StartupProfiler, format_import_breakdown, import_breakdown
+
+
+# The tabs of distributions.DISTRIBUTIONS, in its order. Their labels are repeated here so the buttons
+# can be built before the registry and NumPy are imported.
+DISTRIBUTION_TABS = [
+    ('uniform', 'Uniforme'),
+    ('exponential', 'Exponencial'),
+    ('normal', 'Normal'),
+    ('poisson', 'Poisson'),
+    ('gamma', 'Gamma (Erlang)'),
+    ('triangular', 'Triangular'),
+    ('lognormal', 'Lognormal'),
+]
+
+
+def distribution_tab(components, name: str):
+    from distributions import DISTRIBUTIONS
+    
+    return components.Tab(DISTRIBUTIONS[name])
 
 
 class MainWindow(QWidget):
-    def __init__(self):
+    def __init__(self, profiler: StartupProfiler | None = None):
         super().__init__()
+        self.profiler = profiler
         self.setWindowTitle("TP2 - Generación de variables aleatorias")
         self.resize(1200, 900)
 
         pagelayout = QVBoxLayout()
-        button_layout = QHBoxLayout()
+        self.button_layout = QHBoxLayout()
         self.stacklayout = QStackedLayout()
         
-        pagelayout.addLayout(button_layout)
+        pagelayout.addLayout(self.button_layout)
         pagelayout.addLayout(self.stacklayout)
         
-        btn = QPushButton("Uniforme")
-        btn.pressed.connect(self.activate_tab_1)
-        button_layout.addWidget(btn)
-        self.stacklayout.addWidget(Tab(UniformLeftPanel, None))
-
-        btn = QPushButton("Exponencial")
-        btn.pressed.connect(self.activate_tab_2)
-        button_layout.addWidget(btn)
-        self.stacklayout.addWidget(Tab(ExponentialLeftPanel, None))
-
-        btn = QPushButton("Normal")
-        btn.pressed.connect(self.activate_tab_3)
-        button_layout.addWidget(btn)
-        self.stacklayout.addWidget(Tab(NormalLeftPanel, None))
+        # The timings of the last run, when the pipeline is instrumented.
+        self.status_bar = QStatusBar(self)
+        self.status_bar.setVisible(INSTRUMENTATION.enabled)
+        pagelayout.addWidget(self.status_bar)
+        INSTRUMENTATION.listeners.append(self.show_report)
+        
+        self.pages = [(label, lambda components, name=name: distribution_tab(components, name)) for name, label in DISTRIBUTION_TABS]
+        self.pages.append(('Pruebas de aleatoriedad', lambda components: components.RandomnessTab()))
+        self.pages.append(('Comparación', lambda components: components.ComparisonTab()))
+        self.tabs = [None] * len(self.pages)
+        for i, (label, _) in enumerate(self.pages):
+            btn = QPushButton(label)
+            btn.pressed.connect(lambda i=i: self.activate_tab(i))
+            self.button_layout.addWidget(btn)
+            self.stacklayout.addWidget(QWidget())
 
         self.setLayout(pagelayout)
+        
+        # The first tab is built once the event loop runs, so the window and its buttons show up before NumPy loads.
+        QTimer.singleShot(0, self._build_first_tab)
 
-    def activate_tab_1(self):
-        self.stacklayout.setCurrentIndex(0)
+    def _build_first_tab(self):
+        self.activate_tab(0)
+        if self.profiler is not None:
+            self.profiler.mark('first tab built')
+            print(self.profiler.report(), file=sys.stderr)
+            print(format_import_breakdown(import_breakdown('components')), file=sys.stderr)
+
+    def _ensure_tab(self, index: int):
+        if self.tabs[index] is not None:
+            return
+        
+        import components
+        
+        tab = self.pages[index][1](components)
+        placeholder = self.stacklayout.widget(index)
+        self.stacklayout.insertWidget(index, tab)
+        self.stacklayout.removeWidget(placeholder)
+        placeholder.deleteLater()  # type: ignore
+        self.tabs[index] = tab
 
-    def activate_tab_2(self):
-        self.stacklayout.setCurrentIndex(1)
+    def activate_tab(self, index: int):
+        self._ensure_tab(index)
+        self.stacklayout.setCurrentIndex(index)
 
-    def activate_tab_3(self):
-        self.stacklayout.setCurrentIndex(2)
+    def show_report(self, report: dict):
+        self.status_bar.showMessage(f'{report["label"]}: {format_report(report)}')
 
 
 if __name__ == "__main__":
+    freeze_support()
+    profiler = StartupProfiler(STARTUP) if '--profile-startup' in sys.argv else None
+    if profiler is not None:
+        profiler.mark('Qt imported')
+    if '--instrument' in sys.argv and not INSTRUMENTATION.enabled:
+        INSTRUMENTATION.configure(enabled=True)
+    
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(profiler)
     window.show()
+    if profiler is not None:
+        profiler.mark('window shown')
+    
     sys.exit(app.exec_())
@@ -0,0 +1,271 @@
+"""Benchmarks for the generators, the binning and the table models.
+
+Usage:
+    python benchmark.py --out bench.json
+    python benchmark.py --quick --compare bench.json
+    python benchmark.py --quick --validate
+
+Every case records its best wall time over a few repeats, the throughput in samples per second
+and the peak memory traced by tracemalloc (NumPy reports its buffers to it). With --compare the
+run is checked against a previous JSON file and the command exits with status 1 when a case got
+slower than the tolerance allows. With --validate, every generator case is also checked against
+its distribution (Kolmogorov-Smirnov, chi-square and moments), so the fastest of the methods of a
+distribution can be chosen among the statistically sound ones, and its scalar and batch paths are
+checked against each other; the command exits with status 1 when they diverge.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from binning import Binning
+from distributions import for_callback
+from fit import chi_square_test, ks_test
+from generators import (
+    BATCH_GENERATORS, compare_generation_paths, gamma_distribution_generator, generate_random_variable_distribution,
+    generate_random_variable_distribution_scalar, lognormal_distribution_generator, negative_exponential_distribution_generator,
+    normal_distribution_generator, normal_distribution_generator_box_muller, normal_distribution_generator_polar,
+    normal_distribution_generator_ziggurat, poisson_distribution_generator, triangular_distribution_generator, uniform_distribution_generator
+)
+from rng import make_rng
+
+
+# Size of the scalar sample the batch path is compared with in validate; the scalar path runs at ~10^5 values/s.
+VALIDATION_SCALAR_SIZE = 100_000
+
+GENERATOR_CASES = {
+    'uniform': (uniform_distribution_generator, {'min': 0.0, 'max': 1.0}),
+    'exponential': (negative_exponential_distribution_generator, {'lamb': 0.5}),
+    'normal_convolution': (normal_distribution_generator, {'mu': 0.0, 'sigma': 1.0}),
+    'normal_box_muller': (normal_distribution_generator_box_muller, {'mu': 0.0, 'sigma': 1.0}),
+    'normal_polar': (normal_distribution_generator_polar, {'mu': 0.0, 'sigma': 1.0}),
+    'normal_ziggurat': (normal_distribution_generator_ziggurat, {'mu': 0.0, 'sigma': 1.0}),
+    'poisson': (poisson_distribution_generator, {'lamb': 4.0}),
+    'gamma': (gamma_distribution_generator, {'k': 2.5, 'lamb': 1.0}),
+    'triangular': (triangular_distribution_generator, {'min': 0.0, 'mode': 0.3, 'max': 1.0}),
+    'lognormal': (lognormal_distribution_generator, {'mu': 0.0, 'sigma': 0.5}),
+}
+
+
+def measure(func, repeat: int = 3) -> dict:
+    """Runs func `repeat` times and returns the best time and the highest traced memory peak."""
+    best = float('inf')
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = min(best, elapsed)
+    return {'seconds': best, 'peak_bytes': peak}
+
+
+def _record(name: str, n: int, measurement: dict) -> dict:
+    seconds = measurement['seconds']
+    return {
+        'name': name,
+        'n': n,
+        'seconds': seconds,
+        'samples_per_second': n / seconds if seconds > 0 else float('inf'),
+        'peak_bytes': measurement['peak_bytes'],
+    }
+
+
+def bench_generators(scalar_n: int, batch_n: int, repeat: int) -> list[dict]:
+    results = []
+    for label, (callback, kwargs) in GENERATOR_CASES.items():
+        results.append(_record(f'scalar/{label}', scalar_n, measure(
+            lambda: generate_random_variable_distribution_scalar(scalar_n, callback, 4, **kwargs), repeat
+        )))
+        batch = BATCH_GENERATORS[callback]
+        results.append(_record(f'batch/{label}', batch_n, measure(
+            lambda: batch(batch_n, rng=make_rng(0), **kwargs), repeat
+        )))
+    return results
+
+
+def bench_distribution(sizes: list[int], repeat: int) -> list[dict]:
+    results = []
+    for label, (callback, kwargs) in GENERATOR_CASES.items():
+        for n in sizes:
+            results.append(_record(f'distribution/{label}', n, measure(
+                lambda: generate_random_variable_distribution(n, callback, 4, rng=make_rng(0), **kwargs), repeat
+            )))
+    return results
+
+
+def bench_histograms(n: int, repeat: int) -> list[dict]:
+    data = generate_random_variable_distribution(n, normal_distribution_generator_box_muller, 4, rng=make_rng(0), mu=0.0, sigma=1.0)
+    results = []
+    for bins in (5, 10, 15, 20, 25):
+        results.append(_record(f'histogram/{bins}', n, measure(lambda: Binning(data).histogram(bins), repeat)))
+    return results
+
+
+def bench_tables(n: int, repeat: int) -> list[dict]:
+    """PandasModel and ArrayModel construction and access to the first screenful of cells, on the offscreen Qt platform."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        import pandas as pd
+        from PyQt5.QtWidgets import QApplication
+        from visualization import ArrayModel, PandasModel
+    except ImportError as e:
+        print(f'Skipping table benchmarks: {e}', file=sys.stderr)
+        return []
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    data = generate_random_variable_distribution(n, uniform_distribution_generator, 4, rng=make_rng(0), min=0.0, max=1.0)
+
+    def read_cells(model):
+        for row in range(min(100, model.rowCount())):
+            model.data(model.index(row, 0))
+
+    return [
+        _record('table/pandas_model', n, measure(lambda: read_cells(PandasModel(pd.DataFrame(data, columns=['Valores']))), repeat)),
+        _record('table/array_model', n, measure(lambda: read_cells(ArrayModel(data, ['Valores'])), repeat)),
+    ]
+
+
+def validate(n: int, seed: int = 0, kind: str = 'numpy', bins: int = 50, alpha: float = 0.01) -> list[dict]:
+    """Tests a sample of n values of every generator case against its distribution.
+
+    The K-S test is skipped for discrete distributions, as in the window. A case passes when no
+    test rejects at `alpha`; at n = 10^6 the tests detect deviations a small sample hides, e.g.
+    the truncated tails of the convolution normal. Separately, paths_passed tells whether the
+    scalar and batch paths agree (generators.compare_generation_paths on up to
+    VALIDATION_SCALAR_SIZE values each).
+    """
+    results = []
+    for label, (callback, kwargs) in GENERATOR_CASES.items():
+        distribution = for_callback(callback)
+        start = time.perf_counter()
+        data = generate_random_variable_distribution(n, callback, -1, rng=make_rng(seed, kind), **kwargs)
+        seconds = time.perf_counter() - start
+
+        binning = Binning(data)
+        chi = chi_square_test(*binning.histogram(bins), distribution.cdf, **kwargs)  # type: ignore
+        ks = None if distribution.discrete else ks_test(None, distribution.cdf, sorted_data=binning.sorted_values(), **kwargs)  # type: ignore
+        p_values = [chi['p_value']] + ([ks['p_value']] if ks is not None else [])
+        paths = compare_generation_paths(min(n, VALIDATION_SCALAR_SIZE), callback, seed=seed, alpha=alpha, **kwargs)
+        results.append({
+            'name': label,
+            'n': n,
+            'seconds': seconds,
+            'samples_per_second': n / seconds if seconds > 0 else float('inf'),
+            'mean': float(data.mean()),
+            'variance': float(data.var(ddof=1)),
+            'expected_mean': distribution.mean(**kwargs),  # type: ignore
+            'expected_variance': distribution.variance(**kwargs),  # type: ignore
+            'chi2_p_value': chi['p_value'],
+            'ks_statistic': ks['statistic'] if ks is not None else None,
+            'ks_p_value': ks['p_value'] if ks is not None else None,
+            'passed': min(p_values) >= alpha,
+            'paths_ks_statistic': paths['ks_statistic'],
+            'paths_ks_critical': paths['ks_critical'],
+            'paths_passed': paths['passed'],
+        })
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(max_exponent: int = 7, repeat: int = 3) -> dict:
+    sizes = [10 ** e for e in range(3, max_exponent + 1)]
+    results = []
+    results += bench_generators(scalar_n=min(sizes[-1], 100_000), batch_n=sizes[-1], repeat=repeat)
+    results += bench_distribution(sizes, repeat)
+    results += bench_histograms(sizes[-1], repeat)
+    results += bench_tables(min(sizes[-1], 1_000_000), repeat)
+
+    return {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Returns a message for every case that is more than `tolerance` (as a fraction) slower than the baseline."""
+    previous = {(r['name'], r['n']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['name'], result['n']))
+        if before is None:
+            continue
+        ratio = result['seconds'] / before['seconds'] if before['seconds'] > 0 else 1.0
+        if ratio > 1 + tolerance:
+            regressions.append(f"{result['name']} (n={result['n']}): {before['seconds']:.6f}s -> {result['seconds']:.6f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks de generadores, agrupamiento en intervalos y tablas.')
+    parser.add_argument('--max-exponent', type=int, default=7, help='Largest n as a power of ten (default 7).')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeats per case, the best time is kept (default 3).')
+    parser.add_argument('--quick', action='store_true', help='Shortcut for --max-exponent 5 --repeat 1.')
+    parser.add_argument('--out', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='Compare against a previous JSON file.')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown when comparing (default 0.2).')
+    parser.add_argument('--validate', action='store_true', help='Also test every generator case against its distribution.')
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.max_exponent, args.repeat = 5, 1
+
+    report = run(args.max_exponent, args.repeat)
+    status = 0
+
+    for result in report['results']:
+        print(f"{result['name']:<32} n={result['n']:<10} {result['seconds']:>10.6f}s "
+              f"{result['samples_per_second']:>14.0f} samples/s {result['peak_bytes'] / 2**20:>9.2f} MiB")
+
+    if args.validate:
+        report['validation'] = validate(10 ** args.max_exponent)
+        for result in report['validation']:
+            ks = f"{result['ks_p_value']:.4f}" if result['ks_p_value'] is not None else '-'
+            print(f"validate/{result['name']:<23} n={result['n']:<10} {result['samples_per_second']:>14.0f} samples/s "
+                  f"mean {result['mean']:>9.4f} ({result['expected_mean']:g}) variance {result['variance']:>9.4f} "
+                  f"({result['expected_variance']:g}) chi2 p {result['chi2_p_value']:.4f} K-S p {ks} "
+                  f"scalar/batch D {result['paths_ks_statistic']:.4f} {'OK' if result['passed'] else 'RECHAZADO'}")
+        diverged = [result for result in report['validation'] if not result['paths_passed']]
+        for result in diverged:
+            print(f"DIVERGENCE {result['name']}: scalar vs batch D = {result['paths_ks_statistic']:.6f} "
+                  f"> {result['paths_ks_critical']:.6f}")
+        if diverged:
+            status = 1
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f'REGRESSION {message}')
+        if regressions:
+            status = 1
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+import numpy as np
+
+from storage import SampleBuffer, grid_ceil
+
+
+class Binning:
+    """Frequency histograms of one sample, computed once per number of intervals.
+
+    The chart and the frequency table both read from here, so changing the number of intervals
+    or redrawing never bins the raw sample twice. The stored values are sorted once, after that
+    every new number of intervals costs one np.searchsorted over the edges, O(bins log n),
+    instead of another pass over the whole sample.
+    """
+
+    def __init__(self, data):
+        self.data = data if isinstance(data, SampleBuffer) else SampleBuffer(np.asarray(data))
+        self._sorted = None
+        self._histograms = {}
+
+    def add(self, bins: int, counts: np.ndarray, bin_edges: np.ndarray):
+        """Stores a histogram that was already computed elsewhere, e.g. by the generation job."""
+        self._histograms[bins] = (counts, bin_edges)
+
+    def sorted_raw(self) -> np.ndarray:
+        """The stored values in ascending order, sorted on first use."""
+        if self._sorted is None:
+            self._sorted = np.sort(self.data.raw)
+        return self._sorted
+
+    def sorted_values(self) -> np.ndarray:
+        return self.data.decode(self.sorted_raw())
+
+    def histogram(self, bins: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (counts, bin_edges) with the same semantics as np.histogram."""
+        if bins not in self._histograms:
+            self._histograms[bins] = self._histogram(bins)
+        return self._histograms[bins]
+
+    def _histogram(self, bins: int) -> tuple[np.ndarray, np.ndarray]:
+        ordered = self.sorted_raw()
+        if len(ordered) == 0:
+            return np.histogram(ordered, bins=bins)
+
+        low, high = float(ordered[0]), float(ordered[-1])
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+
+        # Binning is linear, so the stored values are binned directly and only the edges are rescaled.
+        raw_edges = np.linspace(low, high, bins + 1)
+        thresholds = raw_edges[:-1]
+        if ordered.dtype == np.float32 and self.data.ndigits >= 0:
+            # float32 values are compared as the decimals they stand for, as float64 ones are and as
+            # the tests expect (see fit.rounded_edges), not as their slightly different float32 value.
+            # The first edge is the minimum itself and is kept as is, snapping it could pass over it.
+            interior = grid_ceil(thresholds[1:], self.data.ndigits) / 10.0 ** self.data.ndigits
+            thresholds = np.concatenate((ordered[:1], interior.astype(np.float32)))
+        starts = np.searchsorted(ordered, thresholds, side='left')
+        counts = np.diff(np.append(starts, len(ordered)))
+        return counts, raw_edges / self.data.scale if self.data.scale != 1 else raw_edges
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from binning import Binning
+from storage import SampleBuffer
+
+
+DEFAULT_BUDGET_BYTES = int(os.environ.get('TP2_CACHE_BUDGET_MB', 512)) * 2**20
+
+
+def sample_key(distribution: str, params: dict, n: int, seed: int, kind: str, storage: str, ndigits: int,
+               workers: int | None = None) -> tuple:
+    """Everything that determines a generated sample bit for bit.
+
+    `workers` is part of the key because a parallel run spawns one stream per worker, so the same
+    seed gives a different sample for a different worker count (None for a serial run).
+    """
+    return (distribution, tuple(sorted(params.items())), n, seed, kind, storage, ndigits, workers)
+
+
+class CacheEntry:
+    """A cached sample together with everything derived from it.
+
+    The histograms and the sorted copy live in `binning`; any other derived result (moments, fit
+    statistics...) is memoized in `artifacts` through memo().
+    """
+
+    def __init__(self, key: tuple, data: SampleBuffer, binning: Binning | None = None, artifacts: dict | None = None):
+        self.key = key
+        self.data = data
+        self.binning = binning if binning is not None else Binning(data)
+        self.artifacts = artifacts if artifacts is not None else {}
+
+    @property
+    def nbytes(self) -> int:
+        sorted_bytes = self.binning._sorted.nbytes if self.binning._sorted is not None else 0
+        return self.data.nbytes + sorted_bytes
+
+    def memo(self, name, compute):
+        if name not in self.artifacts:
+            self.artifacts[name] = compute()
+        return self.artifacts[name]
+
+
+class SampleCache:
+    """Least-recently-used cache of generated samples with a memory budget.
+
+    Entries are evicted from the least recently used one until the cached samples (and their
+    sorted copies) fit in `budget_bytes`; the entry just stored or read is never evicted. With a
+    `directory`, every stored sample is also written there as .npy plus a JSON sidecar and read
+    back on a miss, so repeated experiments survive a restart.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES, directory: str | None = None):
+        self.budget_bytes = budget_bytes
+        self.directory = directory
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def entries(self) -> list[CacheEntry]:
+        """The cached entries, most recently used last."""
+        return list(self._entries.values())
+
+    def get(self, key: tuple) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+
+        self._entries.move_to_end(key)
+        self._evict()
+        return entry
+
+    def put(self, key: tuple, data: SampleBuffer, binning: Binning | None = None, artifacts: dict | None = None) -> CacheEntry:
+        entry = CacheEntry(key, data, binning, artifacts)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._save(entry)
+        self._evict()
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def _evict(self):
+        total = self.nbytes
+        while total > self.budget_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.nbytes
+
+    def _paths(self, key: tuple) -> tuple[str, str]:
+        digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest)  # type: ignore
+        return base + '.npy', base + '.json'
+
+    def _save(self, entry: CacheEntry):
+        if self.directory is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        data_path, meta_path = self._paths(entry.key)
+        if not isinstance(entry.data.raw, np.memmap):
+            np.save(data_path, entry.data.raw)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': entry.key, 'scale': entry.data.scale, 'ndigits': entry.data.ndigits}, f)
+
+    def _load(self, key: tuple) -> CacheEntry | None:
+        if self.directory is None:
+            return None
+
+        data_path, meta_path = self._paths(key)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        raw = np.load(data_path, mmap_mode='r')
+        return CacheEntry(key, SampleBuffer(raw, meta['scale'], meta['ndigits']))
@@ -0,0 +1,99 @@
+"""The matplotlib canvases of the window.
+
+Importing matplotlib and its Qt backend takes about half a second, so this module is only imported
+by the widgets that draw, when they draw for the first time, and not while the window starts up.
+"""
+import matplotlib
+import numpy as np
+
+matplotlib.use('Qt5Agg')
+
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+
+from instrumentation import INSTRUMENTATION, NULL_RUN
+from plots import draw_histogram
+
+
+def new_canvas(width: int = 7, height: int = 5, dpi: int = 100) -> FigureCanvasQTAgg:
+    """An empty canvas with a single axes, as figure.get_axes()[0]."""
+    canvas = FigureCanvasQTAgg(Figure(figsize=(width, height), dpi=dpi))
+    canvas.figure.add_subplot(111)
+    return canvas
+
+
+class HistogramWidget(FigureCanvasQTAgg):
+    # Past this many intervals the legend would cover the chart.
+    LEGEND_MAX_INTERVALS = 25
+
+    def __init__(self, x, intervals, label: str, width: int = 5, height: int = 4, dpi: int = 100, parent=None):
+        self.x = x
+        self.intervals = intervals
+        self.label = label
+        self.bin_edges = None
+        self.bars = None
+        self.error_bars = None
+        self.metrics = NULL_RUN
+        
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        ax = fig.add_subplot(111)
+        ax.set_xlabel("Valor")
+        ax.set_ylabel("Frecuencia")
+        ax.set_title("Histograma de distribución de frecuencia")
+        super().__init__(fig)
+        
+    def update_histogram(self, counts, bin_edges):
+        """Draws precomputed counts.
+
+        The bars are kept between calls: when the edges did not change (e.g. the partial results of
+        a streamed run) only their heights are updated, and the bars and legend are rebuilt only
+        for a new interval layout. The redraw is left to draw_idle, so bursts of updates coalesce.
+        """
+        ax = self.figure.get_axes()[0]
+        # The deferred draw is timed as part of the run that asked for it, which waits for it to finish.
+        metrics = INSTRUMENTATION.current or NULL_RUN
+        if metrics is not self.metrics:
+            metrics.hold()
+            self.metrics.release()
+            self.metrics = metrics
+        
+        if self.bars is not None and self.bin_edges is not None and np.array_equal(bin_edges, self.bin_edges):
+            for bar, count in zip(self.bars, counts):
+                bar.set_height(count)
+        else:
+            self._build_bars(ax, counts, bin_edges)
+
+        self.counts = counts
+        self.bin_edges = bin_edges
+        self.intervals = len(counts)
+        
+        ax.relim()
+        ax.autoscale_view()
+        self.draw_idle()
+        return self.counts, self.bin_edges
+    
+    def draw(self):
+        metrics, self.metrics = self.metrics, NULL_RUN
+        with metrics.stage('draw'):
+            super().draw()
+        metrics.release()
+    
+    def set_error_bars(self, low=None, high=None):
+        """Draws [low, high] around the top of every bar, e.g. a confidence interval, or removes them when low is None."""
+        if self.error_bars is not None:
+            self.error_bars.remove()
+            self.error_bars = None
+        
+        if low is not None and self.bin_edges is not None:
+            ax = self.figure.get_axes()[0]
+            centers = (self.bin_edges[:-1] + self.bin_edges[1:]) / 2
+            self.error_bars = ax.errorbar(
+                centers, self.counts, yerr=[self.counts - low, high - self.counts], fmt='none', ecolor='black', capsize=3
+            )
+        self.draw_idle()
+    
+    def _build_bars(self, ax, counts, bin_edges):
+        if self.bars is not None:
+            self.bars.remove()
+        
+        self.bars = draw_histogram(ax, counts, bin_edges, interval_legend_max=self.LEGEND_MAX_INTERVALS)
@@ -0,0 +1,315 @@
+"""Headless generation of samples, frequency tables and fit statistics.
+
+Only NumPy is loaded, neither Qt, matplotlib nor pandas, so it starts fast and runs on servers
+without a display.
+
+Usage:
+    python cli.py gen normal --n 1e7 --mu 0 --sigma 1 --seed 42 --bins 20 --out sample.npy
+    python cli.py gen normal --n 1e7 --mu 0 --sigma 1 --sampler ziggurat --fit fit.json
+    python cli.py gen exponential --n 1e8 --lamb 2 --stream --table freq.csv --fit fit.json
+    python cli.py batch jobs.json
+    python cli.py randomness --n 1e7 --rng lcg_mixed --seed 1
+    python cli.py replicate normal --n 1e5 --replications 1000 --mu 0 --sigma 1 --bins 20 --table reps.csv
+
+A batch file holds a JSON list of jobs (or an object with a "jobs" list). Every job takes the same
+keys as the gen options, e.g.
+    {"distribution": "uniform", "n": 100000, "params": {"min": 0, "max": 1}, "seed": 1, "out": "u.npy"}
+and a job with a "replications" key takes the replicate options instead.
+"""
+import argparse
+import json
+import sys
+import time
+from multiprocessing import freeze_support
+
+import numpy as np
+
+from binning import Binning
+from distributions import DISTRIBUTIONS
+from fit import chi_square_test, ks_test
+from parallel import generate_random_variable_distribution_chunked, generate_random_variable_distribution_parallel
+from randomness import RANDOMNESS_SOURCES, assess
+from replication import run_replications
+from rng import RNG_KINDS, make_rng, new_seed
+from session import write_sidecar
+from storage import STORAGE_FORMATS, SampleBuffer, storage_scale
+from streaming import generate_stream
+
+
+def parse_size(text) -> int:
+    """Accepts sizes written as integers or in scientific notation, e.g. 1e7."""
+    n = int(float(text))
+    if n <= 0:
+        raise ValueError('n must be greater than 0')
+    return n
+
+
+def write_frequency_table(path: str, counts: np.ndarray, bin_edges: np.ndarray, fit: dict | None):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        header = ['lower', 'upper', 'observed']
+        if fit is not None:
+            header += ['expected', 'chi2_contribution']
+        f.write(','.join(header) + '\n')
+        for i, count in enumerate(counts):
+            row = [repr(float(bin_edges[i])), repr(float(bin_edges[i + 1])), str(int(count))]
+            if fit is not None:
+                row += [repr(float(fit['expected'][i])), repr(float(fit['contributions'][i]))]
+            f.write(','.join(row) + '\n')
+
+
+def _job_callback(distribution, job: dict):
+    """The scalar generator of the job's "sampler" method, the default one when it has none."""
+    samplers = distribution.sampler_choices()
+    sampler = job.get('sampler') or distribution.sampler
+    if sampler not in samplers:
+        raise ValueError(f'La distribución {distribution.name} no tiene el método {sampler}.')
+    return samplers[sampler]
+
+
+def run_job(job: dict) -> dict:
+    """Runs one generation job and writes the files it asks for.
+
+    Args:
+        job (dict): distribution, n, params and optionally sampler, seed, rng, ndigits, storage, bins, workers,
+            stream, out (.npy samples, in the storage format, with the JSON sidecar of a session file), table
+            (.csv frequency table) and fit (.json statistics).
+
+    Returns:
+        dict: A summary of the run: its seed, timing, sample and theoretical moments and fit statistics.
+    """
+    distribution = DISTRIBUTIONS[job['distribution']]
+    if job.get('replications'):
+        return run_replication_job(job)
+
+    callback = _job_callback(distribution, job)
+    params = distribution.parse(job['params'])
+    n = parse_size(job['n'])
+    seed = int(job['seed']) if job.get('seed') is not None else new_seed()
+    kind = job.get('rng', 'numpy')
+    ndigits = int(job.get('ndigits', 4))
+    bins = int(job.get('bins', 10))
+    storage = job.get('storage', 'float64')
+    scale = storage_scale(storage, ndigits)
+
+    start = time.perf_counter()
+    ks = None
+    if job.get('stream'):
+        stream = generate_stream(n, callback, ndigits, rng=make_rng(seed, kind), spill_path=job.get('out'), storage=storage, **params)
+        counts, bin_edges = stream.histogram.histogram(bins)
+        moments = {'mean': stream.stats.mean, 'variance': stream.stats.variance, 'min': stream.stats.min, 'max': stream.stats.max}
+        data = SampleBuffer(stream.data, scale, ndigits) if stream.data is not None else None
+    else:
+        if job.get('workers'):
+            raw = generate_random_variable_distribution_parallel(
+                n, callback, ndigits, seed=seed, kind=kind, workers=int(job['workers']), storage=storage, **params
+            )
+        else:
+            raw = generate_random_variable_distribution_chunked(n, callback, ndigits, rng=make_rng(seed, kind), storage=storage, **params)
+        data = SampleBuffer(raw, scale, ndigits)
+        if job.get('out'):
+            np.save(job['out'], data.raw)
+        binning = Binning(data)
+        counts, bin_edges = binning.histogram(bins)
+        moments = {'mean': float(raw.mean(dtype=np.float64)) / scale,
+                   'variance': float(raw.var(dtype=np.float64, ddof=1)) / scale ** 2 if n > 1 else 0.0,
+                   'min': data.min(), 'max': data.max()}
+        if not distribution.discrete:
+            ks = ks_test(None, distribution.cdf, sorted_data=binning.sorted_values(), ndigits=ndigits, **params)
+
+    if job.get('out'):
+        # The sidecar lets the window reopen the samples as a session.
+        write_sidecar(job['out'], data, distribution=job['distribution'], params=params, n=n, generator=callback.__name__,
+                      seed=seed, rng=kind, storage=storage, workers=int(job['workers']) if job.get('workers') and not job.get('stream') else None,
+                      intervals=bins)
+
+    chi = chi_square_test(counts, bin_edges, distribution.cdf, ndigits=ndigits, **params)
+    if job.get('table'):
+        write_frequency_table(job['table'], counts, bin_edges, chi)
+
+    summary = {
+        'distribution': job['distribution'],
+        'params': params,
+        'n': n,
+        'generator': callback.__name__,
+        'seed': seed,
+        'rng': kind,
+        'storage': storage,
+        'scale': scale,
+        'bins': bins,
+        'seconds': time.perf_counter() - start,
+        **moments,
+        'expected_mean': distribution.mean(**params),
+        'expected_variance': distribution.variance(**params),
+        'chi2': {'statistic': chi['statistic'], 'dof': chi['dof'], 'p_value': chi['p_value']},
+        'ks': ks,
+    }
+    if job.get('fit'):
+        with open(job['fit'], 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+def run_replication_job(job: dict) -> dict:
+    """Runs R replications of one distribution and writes the per-interval summary if asked.
+
+    Args:
+        job (dict): distribution, n, params, replications and optionally sampler, seed, rng, ndigits, bins, workers,
+            alpha, confidence and table (.csv with the mean frequency of every interval and its interval).
+
+    Returns:
+        dict: The moments with their confidence intervals and the chi-square rejection rate.
+    """
+    distribution = DISTRIBUTIONS[job['distribution']]
+    params = distribution.parse(job['params'])
+    n = parse_size(job['n'])
+    seed = int(job['seed']) if job.get('seed') is not None else new_seed()
+    bins = int(job.get('bins', 10))
+
+    start = time.perf_counter()
+    result = run_replications(
+        int(job['replications']), n, _job_callback(distribution, job), int(job.get('ndigits', 4)), seed=seed, kind=job.get('rng', 'numpy'),
+        alpha=float(job.get('alpha', 0.05)), confidence=float(job.get('confidence', 0.95)), workers=job.get('workers'), **params
+    )
+    summary = result.summary(bins)
+    seconds = time.perf_counter() - start
+
+    if job.get('table'):
+        with open(job['table'], 'w', encoding='utf-8', newline='') as f:
+            f.write('lower,upper,mean,ci_low,ci_high,expected\n')
+            edges = summary['bin_edges']
+            for i in range(len(summary['mean'])):
+                row = [edges[i], edges[i + 1], summary['mean'][i], summary['low'][i], summary['high'][i], summary['expected'][i]]
+                f.write(','.join(repr(float(value)) for value in row) + '\n')
+
+    return {
+        'distribution': job['distribution'],
+        'params': params,
+        'n': n,
+        'replications': result.replications,
+        'seed': seed,
+        'rng': job.get('rng', 'numpy'),
+        'bins': bins,
+        'seconds': seconds,
+        'confidence': result.confidence,
+        **result.moments(),
+        'expected_mean': distribution.mean(**params),
+        'expected_variance': distribution.variance(**params),
+        'chi2_rejection': {'alpha': result.alpha, 'rate': summary['rejection_rate'], 'low': summary['rejection_low'],
+                           'high': summary['rejection_high'], 'dof': summary['dof']},
+    }
+
+
+def _add_distribution_arguments(sub: argparse.ArgumentParser, distribution):
+    for param in distribution.params:
+        sub.add_argument(f'--{param.name}', type=param.kind, required=True, help=param.label)
+    if distribution.samplers:
+        sub.add_argument('--sampler', choices=list(distribution.sampler_choices()), default=distribution.sampler,
+                         help=f'Generation method (default {distribution.sampler}).')
+    sub.add_argument('--n', type=parse_size, required=True, help='Sample size, e.g. 100000 or 1e7.')
+    sub.add_argument('--seed', type=int, help='Root seed, a fresh one is drawn and reported when omitted.')
+    sub.add_argument('--rng', choices=list(RNG_KINDS), default='numpy')
+    sub.add_argument('--ndigits', type=int, default=4, help='Decimal places, -1 to keep full precision.')
+    sub.add_argument('--bins', type=int, default=10)
+
+
+def _job_from_args(args) -> dict:
+    if args.command == 'replicate':
+        return {
+            'distribution': args.distribution,
+            'n': args.n,
+            'params': {name: getattr(args, name) for name in DISTRIBUTIONS[args.distribution].param_names},
+            'sampler': getattr(args, 'sampler', None),
+            'replications': args.replications,
+            'seed': args.seed,
+            'rng': args.rng,
+            'ndigits': args.ndigits,
+            'bins': args.bins,
+            'workers': args.workers,
+            'alpha': args.alpha,
+            'confidence': args.confidence,
+            'table': args.table,
+        }
+
+    return {
+        'distribution': args.distribution,
+        'n': args.n,
+        'params': {name: getattr(args, name) for name in DISTRIBUTIONS[args.distribution].param_names},
+        'sampler': getattr(args, 'sampler', None),
+        'seed': args.seed,
+        'rng': args.rng,
+        'ndigits': args.ndigits,
+        'storage': args.storage,
+        'bins': args.bins,
+        'workers': args.workers,
+        'stream': args.stream,
+        'out': args.out,
+        'table': args.table,
+        'fit': args.fit,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Generación de variables aleatorias sin interfaz gráfica.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('gen', help='Generate one sample.')
+    distributions = gen.add_subparsers(dest='distribution', required=True)
+    for name, distribution in DISTRIBUTIONS.items():
+        sub = distributions.add_parser(name, help=distribution.label)
+        _add_distribution_arguments(sub, distribution)
+        sub.add_argument('--storage', choices=list(STORAGE_FORMATS), default='float64',
+                         help='Format of the stored samples, fixed32 keeps round(x * 10^ndigits) as int32.')
+        sub.add_argument('--workers', type=int, help='Generate in parallel with this many processes.')
+        sub.add_argument('--stream', action='store_true', help='Generate in chunks at constant memory.')
+        sub.add_argument('--out', help='Write the samples to this .npy file.')
+        sub.add_argument('--table', help='Write the frequency table to this .csv file.')
+        sub.add_argument('--fit', help='Write the summary and fit statistics to this .json file.')
+
+    replicate = commands.add_parser('replicate', help='Run R independent samples and summarize them with confidence intervals.')
+    distributions = replicate.add_subparsers(dest='distribution', required=True)
+    for name, distribution in DISTRIBUTIONS.items():
+        sub = distributions.add_parser(name, help=distribution.label)
+        _add_distribution_arguments(sub, distribution)
+        sub.add_argument('--replications', type=int, required=True, help='Number of independent samples R.')
+        sub.add_argument('--workers', type=int, help='Processes to spread the replications over, defaults to the CPU count.')
+        sub.add_argument('--alpha', type=float, default=0.05, help='Significance level of the chi-square tests.')
+        sub.add_argument('--confidence', type=float, default=0.95, help='Level of the confidence intervals.')
+        sub.add_argument('--table', help='Write the per-interval means and confidence intervals to this .csv file.')
+
+    randomness = commands.add_parser('randomness', help='Run the randomness test battery on a U(0, 1) stream.')
+    randomness.add_argument('--n', type=parse_size, default=1_000_000, help='Stream length, e.g. 1e7.')
+    randomness.add_argument('--seed', type=int, help='Root seed, a fresh one is drawn and reported when omitted.')
+    randomness.add_argument('--rng', choices=list(RANDOMNESS_SOURCES), default='numpy',
+                            help='Generator under test, python is the random module behind the scalar generators.')
+    randomness.add_argument('--alpha', type=float, default=0.05, help='Significance level of every test.')
+
+    batch = commands.add_parser('batch', help='Run the jobs of a JSON file.')
+    batch.add_argument('spec', help='JSON file with a list of jobs.')
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'randomness':
+        start = time.perf_counter()
+        report = assess(args.n, args.seed, args.rng, args.alpha)
+        print(json.dumps({**report, 'seconds': time.perf_counter() - start}))
+        return 0
+
+    if args.command in ('gen', 'replicate'):
+        jobs = [_job_from_args(args)]
+    else:
+        with open(args.spec, encoding='utf-8') as f:
+            spec = json.load(f)
+        jobs = spec['jobs'] if isinstance(spec, dict) else spec
+
+    for job in jobs:
+        print(json.dumps(run_job(job)))
+    return 0
+
+
+if __name__ == '__main__':
+    freeze_support()
+    sys.exit(main())
@@ -1,34 +1,173 @@
-import matplotlib
-import pandas as pd
+import atexit
+import os
+import tempfile
 
-from visualization import PandasModel
-matplotlib.use('Qt5Agg')
+import numpy as np
 
+from visualization import ArrayModel, PandasModel
 
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QComboBox, QLineEdit, QPushButton, QApplication, QLabel, QStackedLayout
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QComboBox, QLineEdit, QPushButton, QApplication, QLabel, QStackedLayout,
+    QCheckBox, QSpinBox, QDoubleSpinBox, QAction, QFileDialog, QListWidget, QListWidgetItem
 )
 
+from PyQt5.QtCore import Qt, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtCore import QLocale
 from PyQt5.QtGui import QKeySequence
 
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
+from binning import Binning
+from cache import SampleCache, sample_key
+from export import default_separator, format_block, write_delimited
+from distributions import SAMPLER_LABELS, for_callback, for_callback_name
+from fit import chi_square_test, ks_test
+from instrumentation import INSTRUMENTATION, NULL_RUN
+from parallel import default_workers
+from plots import PLOT_KINDS, summarize
+from randomness import RANDOMNESS_SOURCES
+from rng import RNG_KINDS, new_seed
+from session import save_session
+from storage import STORAGE_FORMATS, SampleBuffer
+from streaming import RunningStats
+from workers import GenerationJob, GenerationResult, RandomnessJob, ReplicationJob, SessionJob, StreamingJob
 
-from generators import *
+
+MAX_SAMPLE_SIZE = int(os.environ.get('TP2_MAX_SAMPLE_SIZE', 1_000_000))
+MAX_STREAM_SAMPLE_SIZE = int(os.environ.get('TP2_MAX_STREAM_SAMPLE_SIZE', 1_000_000_000))
+MAX_RANDOMNESS_SIZE = int(os.environ.get('TP2_MAX_RANDOMNESS_SIZE', 50_000_000))
+
+# Shared by every tab, so the memory budget covers all the samples the window keeps.
+SAMPLE_CACHE = SampleCache(directory=os.environ.get('TP2_CACHE_DIR'))
+
+# The temporary .npy files of the streamed runs with "Guardar valores en disco". Each one is removed
+# when its run is cancelled, fails or is replaced by another sample, and the rest at exit.
+SPILL_FILES = set()
+
+
+def remove_spill_file(path: str | None):
+    """Deletes a spill file; one that can not be deleted yet (e.g. still mapped on Windows) is retried at exit."""
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return
+    SPILL_FILES.discard(path)
+
+
+@atexit.register
+def _remove_spill_files():
+    for path in list(SPILL_FILES):
+        remove_spill_file(path)
+
+
+def parse_seed(text: str) -> int | None:
+    """The seed typed in a seed input, or None when it was left empty.
+
+    Raises:
+        ValueError: When the text is not a non-negative integer, with the message shown to the user.
+    """
+    if not text.strip():
+        return None
+    try:
+        seed = int(text)
+    except ValueError:
+        seed = -1
+    if seed < 0:
+        raise ValueError('La semilla debe ser un número entero no negativo.')
+    return seed
 
 
 class CopyableTableView(QTableView):
+    SIZE_SAMPLE_ROWS = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setContextMenuPolicy(Qt.ActionsContextMenu)  # type: ignore
+
+        copy_action = QAction('Copiar', self)
+        copy_action.triggered.connect(self.copySelectionToClipboard)
+        self.addAction(copy_action)
+
+        export_action = QAction('Exportar a CSV/TSV…', self)
+        export_action.triggered.connect(self.exportToFile)
+        self.addAction(export_action)
+
+        # Set by an explicit select all (Ctrl+A or the corner button), cleared by any other selection change.
+        self.select_all = False
+
+    def setModel(self, model):
+        super().setModel(model)
+        self.select_all = False
+        if self.selectionModel() is not None:
+            self.selectionModel().selectionChanged.connect(self._clear_select_all)  # type: ignore
+
+    def selectAll(self):
+        super().selectAll()
+        # After the selection changed signal of the call itself, which clears the flag.
+        self.select_all = True
+
+    def _clear_select_all(self, *args):
+        self.select_all = False
+
+    def resizeColumnsToSample(self):
+        """Sizes the columns from a sample of rows instead of measuring every row of the model."""
+        model = self.model()
+        if not isinstance(model, ArrayModel):
+            self.resizeColumnsToContents()
+            return
+
+        metrics = self.fontMetrics()
+        padding = 2 * metrics.horizontalAdvance(' ') + 2 * self.frameWidth()
+        for column in range(model.columnCount()):
+            texts = model.sample_texts(column, self.SIZE_SAMPLE_ROWS) + [model.headerData(column, Qt.Horizontal)]  # type: ignore
+            self.setColumnWidth(column, max(metrics.horizontalAdvance(text) for text in texts) + padding)
+
     def keyPressEvent(self, e):
         if e.matches(QKeySequence.Copy):  # type: ignore
             self.copySelectionToClipboard()
         else:
             super().keyPressEvent(e)
 
+    def _selected_block(self):
+        """Returns the selection as a slice of the model array, or None when it is not one rectangle.
+
+        After a select all, the block spans every row of the array, including the rows the view has
+        not paged in yet. Any other selection is copied exactly as selected.
+        """
+        model = self.model()
+        if not isinstance(model, ArrayModel):
+            return None
+
+        ranges = list(self.selectionModel().selection())  # type: ignore
+        if not ranges:
+            return None
+
+        top, bottom = ranges[0].top(), ranges[0].bottom()
+        if any(r.top() != top or r.bottom() != bottom for r in ranges):
+            return None
+
+        columns = sorted(c for r in ranges for c in range(r.left(), r.right() + 1))
+        if columns != list(range(columns[0], columns[-1] + 1)):
+            return None
+
+        if self.select_all:
+            top, bottom = 0, len(model.array) - 1
+
+        return model.array[top:bottom + 1, columns[0]:columns[-1] + 1]
+
     def copySelectionToClipboard(self):
         selection = self.selectionModel()
         if not selection.hasSelection():  # type: ignore
             return
 
+        decimal = QLocale().decimalPoint()
+        block = self._selected_block()
+        if block is not None:
+            QApplication.clipboard().setText(format_block(block, '\t', decimal))  # type: ignore
+            return
+
         indexes = selection.selectedIndexes()  # type: ignore
         if not indexes:
             return
@@ -49,48 +188,40 @@ class CopyableTableView(QTableView):
 
         clipboard_text = '\n'.join(rows)
 
-        QApplication.clipboard().setText(clipboard_text.replace('.', ','))  # type: ignore
-
+        QApplication.clipboard().setText(clipboard_text.replace('.', decimal))  # type: ignore
 
-class HistogramWidget(FigureCanvasQTAgg):
-    def __init__(self, x, intervals, label: str, width: int = 5, height: int = 4, dpi: int = 100, parent=None):
-        self.x = x
-        self.intervals = intervals
-        self.label = label
-        
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        fig.add_subplot(111)
-        super().__init__(fig)
-        
-    def update_histogram(self, x=None, intervals: int | None = None):
-        if x is not None:
-            self.x = x
-            
-        if intervals is not None:
-            self.intervals = intervals
-        
-        ax = self.figure.get_axes()[0]
-        ax.clear()
-
-        self.counts, self.bin_edges, patches = ax.hist(
-            self.x, bins=self.intervals, alpha=0.7
-        )
+    def exportToFile(self):
+        model = self.model()
+        if model is None:
+            return
 
-        labels = [f"[{self.bin_edges[i]:.2f}, {self.bin_edges[i+1]:.2f})" for i in range(len(self.bin_edges)-1)]
+        path, _ = QFileDialog.getSaveFileName(self, 'Exportar', '', 'CSV (*.csv);;TSV (*.tsv)')
+        if not path:
+            return
 
-        for patch, label in zip(patches, labels): #type: ignore
-            patch.set_label(label)
+        decimal = QLocale().decimalPoint()
+        if isinstance(model, ArrayModel):
+            write_delimited(path, model.array, model.columns, decimal=decimal)
+        elif isinstance(model, PandasModel):
+            model.frame.to_csv(path, sep=default_separator(path, decimal), decimal=decimal, index=False)
 
-        ax.legend(fontsize=8, title="Intervalos")
-        ax.set_xlabel("Valor")
-        ax.set_ylabel("Frecuencia")
-        ax.set_title("Histograma de distribución de frecuencia")
 
-        self.draw()
-        return self.counts, self.bin_edges
+def show_with_metrics(metrics, show):
+    """Calls show() with `metrics` as the active run and finishes the run after the pending chart draw."""
+    if metrics is NULL_RUN:
+        show()
+        return
+    
+    with metrics.active():
+        show()
+    # A run with a pending chart draw finishes after it (see charts.HistogramWidget.draw). A lambda, since
+    # PyQt holds bound methods weakly.
+    QTimer.singleShot(0, lambda: metrics.finish())
 
 
 class RightPanel(QWidget):
+    MAX_INTERVALS = 300
+
     def __init__(self, x, update_dist_table, left_panel, label: str = '', parent=None):
         super().__init__(parent)
         
@@ -99,38 +230,122 @@ class RightPanel(QWidget):
         
         self.x = x
         self.label = label
+        self.binning = None
+        self.replications = None
         
         self.setWindowTitle('Panel Derecho')
         self.setGeometry(100, 100, 400, 600)
 
         layout = QVBoxLayout(self)
 
-        self.combo = QComboBox()
-        self.combo.addItems(['5', '10', '15', '20', '25'])
+        self.intervals_input = QSpinBox()
+        self.intervals_input.setRange(1, self.MAX_INTERVALS)
+        self.intervals_input.setValue(5)
+        self.intervals_input.setPrefix('Intervalos: ')
+        self.intervals_input.setKeyboardTracking(False)
         
-        self.histogram = HistogramWidget(self.x, 5, self.label, width=7, height=5)
+        # The chart takes the place of this empty widget when it first draws, see chart().
+        self.histogram = None
+        self.chart_placeholder = QWidget(self)
+        self.chart_placeholder.setMinimumSize(700, 500)
         
-        self.combo.currentTextChanged.connect(self.update_plot)
+        self.intervals_input.valueChanged.connect(self.update_plot)
         
-        layout.addWidget(self.combo)
-        layout.addWidget(self.histogram)
+        layout.addWidget(self.intervals_input)
+        layout.addWidget(self.chart_placeholder)
 
         self.setLayout(layout)
         
-    def update_plot(self, intervals: str):
-        counts, bin_edges = self.histogram.update_histogram(intervals=int(intervals))
-        self.update_dist_table(counts, bin_edges)
+    def chart(self):
+        """The histogram, created with its first draw so matplotlib is not loaded before the tab is usable."""
+        if self.histogram is None:
+            from charts import HistogramWidget
+            
+            self.histogram = HistogramWidget(self.x, 5, self.label, width=7, height=5)
+            self.layout().replaceWidget(self.chart_placeholder, self.histogram)
+            self.chart_placeholder.deleteLater()  # type: ignore
+        return self.histogram
+    
+    def intervals(self) -> int:
+        return self.intervals_input.value()
+    
+    def set_intervals(self, intervals: int):
+        """Changes the number of intervals without redrawing the current sample, e.g. before showing another one."""
+        self.intervals_input.blockSignals(True)
+        self.intervals_input.setValue(intervals)
+        self.intervals_input.blockSignals(False)
         
-    def update_plot_data(self, x):
-        self.x = x
-        return self.histogram.update_histogram(x=self.x)
+    def update_plot(self, intervals: int):
+        if self.binning is None:
+            return
+        
+        if INSTRUMENTATION.enabled and INSTRUMENTATION.current is None:
+            # A change of intervals by the user is a run of its own.
+            show_with_metrics(INSTRUMENTATION.start_run('intervals', intervals=intervals), lambda: self.update_plot(intervals))
+            return
+        
+        with INSTRUMENTATION.stage('histogram'):
+            counts, bin_edges = self.binning.histogram(intervals)
+        with INSTRUMENTATION.stage('plot'):
+            histogram = self.chart()
+            histogram.update_histogram(counts, bin_edges)
+            if self.replications is not None:
+                summary = self.replications.summary(intervals)
+                histogram.set_error_bars(summary['low'], summary['high'])
+            else:
+                histogram.set_error_bars()
+        with INSTRUMENTATION.stage('frequency_table'):
+            self.update_dist_table(counts, bin_edges)
+    
+    def show_result(self, result):
+        self.x = result.data
+        self.replications = None
+        if result.binning is not None:
+            self.binning = result.binning
+        else:
+            self.binning = Binning(self.x)
+            self.binning.add(len(result.counts), result.counts, result.bin_edges)
+        self.update_plot(self.intervals())
+    
+    def show_partial(self, result):
+        if self.replications is not None:
+            self.replications = None
+            self.chart().set_error_bars()
+        self.chart().update_histogram(result.counts, result.bin_edges)
+    
+    def show_replications(self, result):
+        """Shows the mean frequency of every interval over the replications, with its confidence interval as error bars."""
+        self.x = None
+        self.binning = result
+        self.replications = result
+        self.update_plot(self.intervals())
 
 
 class LeftPanel(QWidget):
-    def __init__(self, update_plot, parent=None):
+    max_sample_size = MAX_SAMPLE_SIZE
+    max_stream_sample_size = MAX_STREAM_SAMPLE_SIZE
+    cache = SAMPLE_CACHE
+    data_generated = pyqtSignal(object)
+    data_partial = pyqtSignal(object)
+    replications_done = pyqtSignal(object)
+
+    def __init__(self, get_intervals=None, set_intervals=None, parent=None):
         super().__init__(parent)
         
-        self.update_plot = update_plot
+        self.get_intervals = get_intervals if get_intervals is not None else lambda: 5
+        self.set_intervals = set_intervals if set_intervals is not None else lambda intervals: None
+        self.data = []
+        self.job = None
+        self.job_id = 0
+        self.fit_target = None
+        self.ndigits = -1
+        self.ks = None
+        self.entry = None
+        self.pending_key = None
+        self.pending_meta = None
+        self.session_meta = None
+        self.replications = None
+        self.spill_file = None
         
         self.setWindowTitle('Configuración de la variable')
         self.setGeometry(100, 100, 400, 600)
@@ -141,6 +356,37 @@ class LeftPanel(QWidget):
         
         self._add_configuration(layout)
 
+        self.seed_input = QLineEdit(self)
+        self.seed_input.setPlaceholderText('Semilla (opcional)')
+        layout.addWidget(self.seed_input)
+
+        self.rng_combo = QComboBox(self)
+        for kind, label in RNG_KINDS.items():
+            self.rng_combo.addItem(label, kind)
+        layout.addWidget(self.rng_combo)
+
+        self.storage_combo = QComboBox(self)
+        for storage, label in STORAGE_FORMATS.items():
+            self.storage_combo.addItem(label, storage)
+        layout.addWidget(self.storage_combo)
+
+        parallel_layout = QHBoxLayout()
+        self.parallel_check = QCheckBox('Generación en paralelo', self)
+        parallel_layout.addWidget(self.parallel_check)
+        self.workers_input = QSpinBox(self)
+        self.workers_input.setRange(1, max(default_workers(), 1))
+        self.workers_input.setValue(default_workers())
+        self.workers_input.setSuffix(' procesos')
+        parallel_layout.addWidget(self.workers_input)
+        layout.addLayout(parallel_layout)
+
+        streaming_layout = QHBoxLayout()
+        self.streaming_check = QCheckBox('Modo streaming', self)
+        streaming_layout.addWidget(self.streaming_check)
+        self.spill_check = QCheckBox('Guardar valores en disco', self)
+        streaming_layout.addWidget(self.spill_check)
+        layout.addLayout(streaming_layout)
+
         self.error_label = QLabel('', self)
         self.error_label.setStyleSheet('color: red;')
         layout.addWidget(self.error_label)
@@ -148,6 +394,34 @@ class LeftPanel(QWidget):
         self.generate_button = QPushButton('Generar variable aleatoria', self)
         self.generate_button.clicked.connect(self.on_generate)
         layout.addWidget(self.generate_button)
+        
+        replication_layout = QHBoxLayout()
+        self.replications_input = QSpinBox(self)
+        self.replications_input.setRange(2, 100_000)
+        self.replications_input.setValue(100)
+        self.replications_input.setSuffix(' réplicas')
+        replication_layout.addWidget(self.replications_input)
+        self.replicate_button = QPushButton('Ejecutar réplicas', self)
+        self.replicate_button.clicked.connect(self.on_replicate)
+        replication_layout.addWidget(self.replicate_button)
+        layout.addLayout(replication_layout)
+        
+        self.cancel_button = QPushButton('Cancelar', self)
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.on_cancel)
+        layout.addWidget(self.cancel_button)
+        
+        session_layout = QHBoxLayout()
+        self.save_button = QPushButton('Guardar sesión…', self)
+        self.save_button.clicked.connect(self.on_save_session)
+        session_layout.addWidget(self.save_button)
+        self.open_button = QPushButton('Abrir sesión…', self)
+        self.open_button.clicked.connect(self.on_open_session)
+        session_layout.addWidget(self.open_button)
+        layout.addLayout(session_layout)
+        
+        self.stats_label = QLabel('', self)
+        layout.addWidget(self.stats_label)
 
         btn = QPushButton('Valores')
         btn.pressed.connect(self.activate_tab_1)
@@ -165,6 +439,10 @@ class LeftPanel(QWidget):
         #layout.addWidget(self.table)
         layout.addLayout(button_layout)
         layout.addLayout(self.stacklayout)
+        
+        self.fit_label = QLabel('', self)
+        self.fit_label.setWordWrap(True)
+        layout.addWidget(self.fit_label)
 
         self.setLayout(layout)
 
@@ -178,32 +456,313 @@ class LeftPanel(QWidget):
         raise NotImplementedError('This method should be implemented in subclasses.')
     
     def _check_inputs(self):
-        if not self.n_input.text().replace('-', '').isdigit():
-            self.error_label.setText('Error: El tamaño de la muestra debe ser un número.')
+        try:
+            n = int(self.n_input.text())
+        except ValueError:
+            self.error_label.setText('Error: El tamaño de la muestra debe ser un número entero.')
             return False
         
-        if not int(self.n_input.text()) > 0:
+        if not n > 0:
             self.error_label.setText('Error: El tamaño de la muestra debe ser mayor que 0.')
             return False
         
-        if not int(self.n_input.text()) <= 1_000_000:
-            self.error_label.setText('Error: El tamaño de la muestra debe ser menor que 1.000.000.')
+        max_sample_size = self.max_stream_sample_size if self.streaming_check.isChecked() else self.max_sample_size
+        if not n <= max_sample_size:
+            max_text = f'{max_sample_size:,}'.replace(',', '.')
+            self.error_label.setText(f'Error: El tamaño de la muestra debe ser menor que {max_text}.')
+            return False
+        
+        try:
+            parse_seed(self.seed_input.text())
+        except ValueError as e:
+            self.error_label.setText(f'Error: {e}')
             return False
         
         return True
     
-    def _get_data(self):
+    def _next_seed(self) -> int:
+        """Picks the seed of the next run and shows it, so the run can be repeated."""
+        seed = parse_seed(self.seed_input.text())
+        self.seed = seed if seed is not None else new_seed()
+        self.seed_input.setPlaceholderText(f'Semilla (opcional, última usada: {self.seed})')
+        return self.seed
+    
+    def _get_generator(self):
+        """Returns (n, callback, kwargs) for the next run, or None when the inputs are invalid."""
         raise NotImplementedError('This method should be implemented in subclasses.')
 
     def on_generate(self):
-        self.data = self._get_data()
-        self.table.setModel(PandasModel(pd.DataFrame(self.data, columns=['Valores'])))
-        self.table.resizeColumnsToContents()
-        counts, bin_edges = self.update_plot(self.data)
-        self.update_dist_table(counts, bin_edges)
+        generator = self._get_generator()
+        if generator is None:
+            return
+        
+        self._cancel_job()
+        
+        n, callback, kwargs = generator
+        self.job_id += 1
+        seed = self._next_seed()
+        kind = self.rng_combo.currentData()
+        storage = self.storage_combo.currentData()
+        metrics = INSTRUMENTATION.start_run(
+            'stream' if self.streaming_check.isChecked() else 'generate', distribution=callback.__name__, n=n
+        )
+        distribution = for_callback(callback)
+        self.pending_meta = {
+            'distribution': distribution.name if distribution is not None else None, 'params': kwargs, 'n': n,
+            'generator': callback.__name__, 'seed': seed, 'rng': kind, 'storage': storage,
+            'workers': self.workers_input.value() if self.parallel_check.isChecked() and not self.streaming_check.isChecked() else None,
+        }
+        if self.streaming_check.isChecked():
+            self.pending_key = None
+            self.job = StreamingJob(
+                self.job_id, n, callback, kwargs, self.get_intervals(), ndigits=4, seed=seed, kind=kind,
+                spill_path=self._spill_path() if self.spill_check.isChecked() else None, storage=storage
+            )
+        else:
+            parallel = self.parallel_check.isChecked()
+            self.pending_key = sample_key(
+                callback.__name__, kwargs, n, seed, kind, storage, 4, self.workers_input.value() if parallel else None
+            )
+            with metrics.stage('cache'):
+                entry = self.cache.get(self.pending_key)
+            if entry is not None:
+                self._reset_job_state()
+                self.session_meta = self.pending_meta
+                show_with_metrics(metrics, lambda: self._show_entry(entry, callback, kwargs))
+                return
+            
+            self.job = GenerationJob(
+                self.job_id, n, callback, kwargs, self.get_intervals(), ndigits=4, seed=seed, kind=kind,
+                parallel=parallel, workers=self.workers_input.value(), storage=storage
+            )
+        self.job.metrics = metrics
+        self.job.signals.progress.connect(self.on_job_progress)
+        self.job.signals.partial.connect(self.on_job_partial)
+        self.job.signals.finished.connect(self.on_job_finished)
+        self.job.signals.failed.connect(self.on_job_failed)
+        
+        self.cancel_button.setEnabled(True)
+        self.generate_button.setText('Generando… 0%')
+        QThreadPool.globalInstance().start(self.job)  # type: ignore
+    
+    def on_replicate(self):
+        generator = self._get_generator()
+        if generator is None:
+            return
+        
+        self._cancel_job()
+        
+        n, callback, kwargs = generator
+        self.job_id += 1
+        self.job = ReplicationJob(
+            self.job_id, self.replications_input.value(), n, callback, kwargs, self.get_intervals(), ndigits=4,
+            seed=self._next_seed(), kind=self.rng_combo.currentData(),
+            workers=self.workers_input.value() if self.parallel_check.isChecked() else 1
+        )
+        self.job.metrics = INSTRUMENTATION.start_run('replicate', distribution=callback.__name__, n=n,
+                                                     replications=self.replications_input.value())
+        self.job.signals.progress.connect(self.on_job_progress)
+        self.job.signals.finished.connect(self.on_replications_finished)
+        self.job.signals.failed.connect(self.on_job_failed)
+        
+        self.cancel_button.setEnabled(True)
+        self.generate_button.setText('Generando… 0%')
+        QThreadPool.globalInstance().start(self.job)  # type: ignore
+    
+    def on_save_session(self):
+        if not isinstance(self.data, SampleBuffer) or len(self.data) == 0:
+            self.error_label.setText('Error: No hay una muestra para guardar.')
+            return
+        
+        path, _ = QFileDialog.getSaveFileName(self, 'Guardar sesión', '', 'Sesión NumPy (*.npy)')
+        if not path:
+            return
+        
+        try:
+            save_session(path, self.data, **(self.session_meta or {}), intervals=self.get_intervals())
+        except (OSError, ValueError) as e:
+            self.error_label.setText(f'Error: No se pudo guardar la sesión: {e}')
+            return
+        self.error_label.setText('')
+    
+    def on_open_session(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, 'Abrir sesión', '', 'Sesiones y datos (*.npy *.csv *.tsv *.txt);;Sesión NumPy (*.npy);;CSV/TSV (*.csv *.tsv *.txt)'
+        )
+        if path:
+            self.open_session(path)
+    
+    def open_session(self, path: str):
+        """Opens a session or a CSV/TSV file in a background job, replacing the current sample when it finishes."""
+        self._cancel_job()
+        
+        self.job_id += 1
+        self.job = SessionJob(self.job_id, path, self.get_intervals(), fallback=self._typed_fit_target())
+        self.job.metrics = INSTRUMENTATION.start_run('open', path=path)
+        self.job.signals.finished.connect(self.on_session_finished)
+        self.job.signals.failed.connect(self.on_job_failed)
+        
+        self.cancel_button.setEnabled(True)
+        self.generate_button.setText('Abriendo sesión…')
+        QThreadPool.globalInstance().start(self.job)  # type: ignore
+    
+    def _typed_fit_target(self) -> tuple | None:
+        """The (distribution, params) an opened file without a sidecar is tested against, from the inputs."""
+        return None
+    
+    def _load_inputs(self, meta: dict):
+        """Fills the inputs with the run of an opened session, so it can be generated again."""
+    
+    def on_session_finished(self, job_id: int, result):
+        if job_id != self.job_id:
+            return
+        metrics = self.job.metrics
+        self._reset_job_state()
+        
+        self.entry = None
+        self._replace_spill_file()
+        self.session_meta = dict(result.session.meta)
+        self._load_inputs(result.session.meta)
+        self.set_intervals(len(result.counts))
+        callback = result.distribution.callback if result.distribution is not None else None
+        show_with_metrics(metrics, lambda: self._show_result(result, callback, result.params))
+    
+    def _spill_path(self) -> str:
+        fd, path = tempfile.mkstemp(prefix='tp2_', suffix='.npy')
+        os.close(fd)
+        SPILL_FILES.add(path)
+        return path
+    
+    def _cancel_job(self):
+        """Cancels the running job, if any, and deletes the values it was spilling to disk."""
+        if self.job is not None:
+            self.job.cancel()
+            remove_spill_file(getattr(self.job, 'spill_path', None))
+    
+    def _replace_spill_file(self, path: str | None = None):
+        """Deletes the spill file of the sample being replaced; `path` is the one of the new sample, if spilled."""
+        if self.spill_file != path:
+            remove_spill_file(self.spill_file)
+        self.spill_file = path
+    
+    def on_cancel(self):
+        if self.job is not None:
+            self.job.metrics.finish()
+        self._cancel_job()
+        self.job_id += 1
+        self._reset_job_state()
+    
+    def _reset_job_state(self):
+        self.job = None
+        self.cancel_button.setEnabled(False)
+        self.generate_button.setText('Generar variable aleatoria')
+    
+    def on_job_progress(self, job_id: int, percent: int):
+        if job_id != self.job_id:
+            return
+        self.generate_button.setText(f'Generando… {percent}%')
+    
+    def on_job_partial(self, job_id: int, result):
+        if job_id != self.job_id:
+            return
+        self.data_partial.emit(result)
+    
+    def on_job_failed(self, job_id: int, message: str):
+        if job_id != self.job_id:
+            return
+        self.job.metrics.finish()
+        remove_spill_file(getattr(self.job, 'spill_path', None))
+        self._reset_job_state()
+        self.error_label.setText(f'Error: {message}')
+    
+    def on_job_finished(self, job_id: int, result):
+        if job_id != self.job_id:
+            return
+        callback, kwargs, metrics = self.job.callback, self.job.kwargs, self.job.metrics
+        self._replace_spill_file(getattr(self.job, 'spill_path', None))
+        self._reset_job_state()
+        
+        self.session_meta = self.pending_meta
+        if self.pending_key is not None:
+            self.entry = self.cache.put(self.pending_key, result.data, result.binning, {'stats': result.stats, 'ks': result.ks})
+        else:
+            self.entry = None
+        show_with_metrics(metrics, lambda: self._show_result(result, callback, kwargs))
+    
+    def _show_entry(self, entry, callback, kwargs):
+        """Shows a cached sample; moments and K-S are only computed if the entry was read from disk."""
+        distribution = for_callback(callback)
+        stats = entry.memo('stats', lambda: RunningStats.from_buffer(entry.data))
+        ks = entry.memo('ks', lambda: ks_test(None, distribution.cdf, sorted_data=entry.binning.sorted_values(),
+                                              ndigits=entry.data.ndigits, **kwargs)
+                        if distribution is not None and not distribution.discrete else None)
+        counts, bin_edges = entry.binning.histogram(self.get_intervals())
+        
+        self._replace_spill_file()
+        self.entry = entry
+        self._show_result(GenerationResult(entry.data, counts, bin_edges, binning=entry.binning, stats=stats, ks=ks), callback, kwargs)
+    
+    def on_replications_finished(self, job_id: int, result):
+        if job_id != self.job_id:
+            return
+        metrics = self.job.metrics
+        self._reset_job_state()
+        show_with_metrics(metrics, lambda: self._show_replications(result))
+    
+    def _show_replications(self, result):
+        
+        distribution = for_callback(result.callback)
+        self._replace_spill_file()
+        self.session_meta = None
+        self.fit_target = (distribution, result.kwargs) if distribution is not None else None
+        self.entry = None
+        self.ks = None
+        self.replications = result
+        self.data = []
+        with INSTRUMENTATION.stage('table_model'):
+            self.table.setModel(ArrayModel(np.column_stack((result.means, result.variances)), ['Media', 'Varianza']))
+        with INSTRUMENTATION.stage('resize_columns'):
+            self.table.resizeColumnsToSample()
+        
+        moments = result.moments()
+        text = (f'{result.replications} réplicas de n = {result.n}, IC del {result.confidence:.0%}: '
+                f'media = {moments["mean"]:.4f} [{moments["mean_low"]:.4f}, {moments["mean_high"]:.4f}], '
+                f'varianza = {moments["variance"]:.4f} [{moments["variance_low"]:.4f}, {moments["variance_high"]:.4f}]')
+        if distribution is not None:
+            text += (f'\nTeóricas: media = {distribution.mean(**result.kwargs):.4f}, '
+                     f'varianza = {distribution.variance(**result.kwargs):.4f}')
+        self.stats_label.setText(text)
+        self.replications_done.emit(result)
+    
+    def _show_result(self, result, callback, kwargs):
+        distribution = for_callback(callback)
+        self.replications = None
+        self.fit_target = (distribution, kwargs) if distribution is not None else None
+        self.ndigits = result.ndigits
+        self.data = result.data
+        self.ks = result.ks
+        with INSTRUMENTATION.stage('table_model'):
+            self.table.setModel(ArrayModel(result.data, ['Valores']))
+        with INSTRUMENTATION.stage('resize_columns'):
+            self.table.resizeColumnsToSample()
+        
+        stats = result.stats
+        memory = f'Memoria de la muestra: {result.data.nbytes / 2**20:.1f} MiB'
+        if stats is not None:
+            text = (f'n = {stats.count}, media = {stats.mean:.4f}, varianza = {stats.variance:.4f}, '
+                    f'mín = {stats.min:.4f}, máx = {stats.max:.4f}. {memory}')
+            if distribution is not None:
+                text += f'\nTeóricas: media = {distribution.mean(**kwargs):.4f}, varianza = {distribution.variance(**kwargs):.4f}'
+            self.stats_label.setText(text)
+        else:
+            self.stats_label.setText(memory)
+        self.data_generated.emit(result)
         
     def update_dist_table(self, counts, bin_edges):
-        counts, bin_edges = self.update_plot(self.data)
+        if self.replications is not None:
+            self._update_replication_table(len(counts))
+            return
+        
         min_edges = [0] * len(counts)
         max_edges = [0] * len(counts)
         frecuencia_acumulada = [0] * len(counts)
@@ -214,150 +773,385 @@ class LeftPanel(QWidget):
                 frecuencia_acumulada[i] = round(counts[i])
             else:
                 frecuencia_acumulada[i] = frecuencia_acumulada[i-1] + round(counts[i])
-        self.dist_table.setModel(PandasModel(pd.DataFrame({
+        columns = {
             'Limite inferior': min_edges, 
             'Limite superior': max_edges, 
             'Frecuencia observada': counts,
             #'Frecuencia acumulada': frecuencia_acumulada
-            })))
+            }
+        
+        if self.fit_target is None:
+            self.fit_label.setText('')
+        else:
+            distribution, kwargs = self.fit_target
+            compute = lambda: chi_square_test(counts, bin_edges, distribution.cdf, ndigits=self.ndigits, **kwargs)
+            chi = self.entry.memo(('chi2', len(counts)), compute) if self.entry is not None else compute()
+            columns['Frecuencia esperada'] = np.round(chi['expected'], 4)
+            columns['(O - E)² / E'] = np.round(chi['contributions'], 4)
+            
+            text = (f'Chi²: {chi["statistic"]:.4f}, grados de libertad: {chi["dof"]}, p-valor: {chi["p_value"]:.4f} '
+                    f'({chi["merged_bins"]} intervalos tras agrupar los de frecuencia esperada < 5)')
+            if self.ks is not None:
+                text += f'\nK-S: D = {self.ks["statistic"]:.6f}, p-valor: {self.ks["p_value"]:.4f}'
+            self.fit_label.setText(text)
+        
+        import pandas as pd
+        
+        self.dist_table.setModel(PandasModel(pd.DataFrame(columns)))
+    
+    def _update_replication_table(self, intervals: int):
+        summary = self.replications.summary(intervals)  # type: ignore
+        bin_edges = summary['bin_edges']
+        columns = {
+            'Limite inferior': np.round(bin_edges[:-1], 4),
+            'Limite superior': np.round(bin_edges[1:], 4),
+            'Frecuencia media': np.round(summary['mean'], 4),
+            'IC inferior': np.round(summary['low'], 4),
+            'IC superior': np.round(summary['high'], 4),
+        }
+        if summary['expected'] is not None:
+            columns['Frecuencia esperada'] = np.round(summary['expected'], 4)
+            self.fit_label.setText(
+                f'Rechazo de Chi² con α = {self.replications.alpha:g}: {summary["rejection_rate"]:.1%} '  # type: ignore
+                f'[{summary["rejection_low"]:.1%}, {summary["rejection_high"]:.1%}] de {self.replications.replications} '  # type: ignore
+                f'réplicas ({summary["dof"]} grados de libertad)'
+            )
+        else:
+            self.fit_label.setText('')
+        
+        import pandas as pd
+        
+        self.dist_table.setModel(PandasModel(pd.DataFrame(columns)))
+
 
+class DistributionLeftPanel(LeftPanel):
+    """Configuration of any distribution of the registry: one input per declared parameter."""
+
+    def __init__(self, distribution, get_intervals=None, set_intervals=None, parent=None):
+        self.distribution = distribution
+        self.params = {}
+        super().__init__(get_intervals, set_intervals, parent)
 
-class UniformLeftPanel(LeftPanel):
     def _add_configuration(self, layout: QVBoxLayout):
         self.n_input = QLineEdit(self)
         self.n_input.setPlaceholderText('Tamaño de la muestra (n)')
         layout.addWidget(self.n_input)
         
-        self.min = QLineEdit(self)
-        self.min.setPlaceholderText('Mínimo valor de la muestra')
-        layout.addWidget(self.min)
+        self.param_inputs = {}
+        for param in self.distribution.params:
+            edit = QLineEdit(self)
+            edit.setPlaceholderText(param.label)
+            layout.addWidget(edit)
+            self.param_inputs[param.name] = edit
         
-        self.max = QLineEdit(self)
-        self.max.setPlaceholderText('Máximo valor de la muestra')
-        layout.addWidget(self.max)
+        # Only for distributions with more than one method, e.g. the normal one.
+        self.sampler_combo = QComboBox(self)
+        for sampler in self.distribution.sampler_choices():
+            self.sampler_combo.addItem(f'Método: {SAMPLER_LABELS.get(sampler, sampler)}', sampler)
+        self.sampler_combo.setVisible(bool(self.distribution.samplers))
+        layout.addWidget(self.sampler_combo)
     
     def _check_inputs(self):
         if not super()._check_inputs():
             return False
         
-        if not self.min.text().replace('.', '', 1).replace('-', '').isdigit() or not self.max.text().replace('.', '', 1).replace('-', '').isdigit():
-            self.error_label.setText('Error: Los valores mínimo y máximo deben ser números.')
-            return False
-        
-        min_val = float(self.min.text())
-        max_val = float(self.max.text())
-        
-        if min_val >= max_val:
-            self.error_label.setText('Error: El valor mínimo debe ser menor que el valor máximo.')
+        try:
+            self.params = self.distribution.parse({name: edit.text() for name, edit in self.param_inputs.items()})
+        except ValueError as e:
+            self.error_label.setText(f'Error: {e}')
             return False
         
         self.error_label.setText('')
         return True
     
-    def _get_data(self):  # type: ignore
+    def _get_generator(self):  # type: ignore
         if not self._check_inputs():
-            return []
-            
-        n = int(self.n_input.text())    
-        min_val = float(self.min.text())
-        max_val = float(self.max.text())
+            return None
+        
+        callback = self.distribution.sampler_choices()[self.sampler_combo.currentData()]
+        return int(self.n_input.text()), callback, self.params
+    
+    def _typed_fit_target(self) -> tuple | None:
+        try:
+            return self.distribution, self.distribution.parse({name: edit.text() for name, edit in self.param_inputs.items()})
+        except ValueError:
+            return None
+    
+    def _load_inputs(self, meta: dict):
+        if meta.get('distribution') != self.distribution.name:
+            return
+        
+        self.n_input.setText(str(meta.get('n', '')))
+        for name, edit in self.param_inputs.items():
+            edit.setText(str(meta['params'][name]) if name in meta.get('params', {}) else '')
+        self.seed_input.setText(str(meta['seed']) if meta.get('seed') is not None else '')
+        samplers = {callback.__name__: sampler for sampler, callback in self.distribution.sampler_choices().items()}
+        self.sampler_combo.setCurrentIndex(max(self.sampler_combo.findData(samplers.get(meta.get('generator'))), 0))
+        for combo, key in ((self.rng_combo, 'rng'), (self.storage_combo, 'storage')):
+            index = combo.findData(meta.get(key))
+            if index >= 0:
+                combo.setCurrentIndex(index)
+        self.parallel_check.setChecked(meta.get('workers') is not None)
+        if meta.get('workers') is not None:
+            self.workers_input.setValue(meta['workers'])
 
-        return generate_random_variable_distribution(n, uniform_distribution_generator, ndigits=4, min=min_val, max=max_val)
 
+class Tab(QWidget):
+    def __init__(self, distribution, parent=None):
+        super().__init__(parent)
 
-class ExponentialLeftPanel(LeftPanel):     
-    def _add_configuration(self, layout: QVBoxLayout):
-        self.n_input = QLineEdit(self)
-        self.n_input.setPlaceholderText('Tamaño de la muestra (n)')
-        layout.addWidget(self.n_input)
+        self.left_panel = DistributionLeftPanel(
+            distribution, lambda: self.right_panel.intervals(), lambda intervals: self.right_panel.set_intervals(intervals)
+        )
         
-        self.lamb = QLineEdit(self)
-        self.lamb.setPlaceholderText('Lambda para la muestra')
-        layout.addWidget(self.lamb)
+        layout = QHBoxLayout(self)
+        layout.addWidget(self.left_panel)
         
-    def _check_inputs(self):
-        if not super()._check_inputs():
-            return False
+        self.right_panel = RightPanel([], self.update_dist_table, left_panel=self.left_panel, label=distribution.label)
+        self.left_panel.data_generated.connect(self.right_panel.show_result)
+        self.left_panel.data_partial.connect(self.right_panel.show_partial)
+        self.left_panel.replications_done.connect(self.right_panel.show_replications)
         
-        if not self.lamb.text().replace('.', '', 1).replace('-', '').isdigit():
-            self.error_label.setText('Error: Lambda debe ser un número.')
-            return False
+        layout.addWidget(self.right_panel)
+
+        self.setLayout(layout)
         
-        lamb_val = float(self.lamb.text())
+    def update_dist_table(self, counts, bin_edges):
+        self.left_panel.update_dist_table(counts, bin_edges)
+
+
+class RandomnessTab(QWidget):
+    """Runs the randomness test battery on the U(0, 1) stream of a generator and lists the results."""
+    max_size = MAX_RANDOMNESS_SIZE
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
         
-        if lamb_val <= 0:
-            self.error_label.setText('Error: Lambda debe ser mayor que 0.')
-            return False
+        self.job_id = 0
+        self.metrics = NULL_RUN
+        self.running = False
         
-        self.error_label.setText('')
-        return True
-    
-    def _get_data(self):  # type: ignore
-        if not self._check_inputs():
-            return []
+        layout = QVBoxLayout(self)
         
-        n = int(self.n_input.text())
-        lamb = float(self.lamb.text())
-        return generate_random_variable_distribution(n, negative_exponential_distribution_generator, ndigits=4, lamb=lamb)
-
-
-class NormalLeftPanel(LeftPanel):
-    def _add_configuration(self, layout: QVBoxLayout):
-        self.n_input = QLineEdit(self)
-        self.n_input.setPlaceholderText('Tamaño de la muestra (n)')
+        self.n_input = QLineEdit('1000000', self)
+        self.n_input.setPlaceholderText('Cantidad de valores (n)')
         layout.addWidget(self.n_input)
         
-        self.mu = QLineEdit(self)
-        self.mu.setPlaceholderText('Media (μ)')
-        layout.addWidget(self.mu)
-
-        self.sigma = QLineEdit(self)
-        self.sigma.setPlaceholderText('Desviación estándar (σ)')
-        layout.addWidget(self.sigma)
+        self.seed_input = QLineEdit(self)
+        self.seed_input.setPlaceholderText('Semilla (opcional)')
+        layout.addWidget(self.seed_input)
         
-    def _check_inputs(self):
-        if not super()._check_inputs():
-            return False
+        self.source_combo = QComboBox(self)
+        for kind, label in RANDOMNESS_SOURCES.items():
+            self.source_combo.addItem(label, kind)
+        layout.addWidget(self.source_combo)
+        
+        self.alpha_input = QDoubleSpinBox(self)
+        self.alpha_input.setRange(0.001, 0.5)
+        self.alpha_input.setDecimals(3)
+        self.alpha_input.setSingleStep(0.01)
+        self.alpha_input.setValue(0.05)
+        self.alpha_input.setPrefix('Nivel de significación: ')
+        layout.addWidget(self.alpha_input)
+        
+        self.error_label = QLabel('', self)
+        self.error_label.setStyleSheet('color: red;')
+        layout.addWidget(self.error_label)
+        
+        self.run_button = QPushButton('Ejecutar pruebas', self)
+        self.run_button.clicked.connect(self.on_run)
+        layout.addWidget(self.run_button)
         
-        if not self.mu.text().replace('.', '', 1).replace('-', '').isdigit() or not self.sigma.text().replace('.', '', 1).replace('-', '').isdigit():
-            self.error_label.setText('Error: La media y la desviación estándar deben ser números.')
+        self.summary_label = QLabel('', self)
+        layout.addWidget(self.summary_label)
+        
+        self.table = CopyableTableView()
+        layout.addWidget(self.table)
+        
+        self.setLayout(layout)
+    
+    def _check_inputs(self) -> bool:
+        try:
+            n = int(float(self.n_input.text()))
+        except (ValueError, OverflowError):
+            self.error_label.setText('Error: La cantidad de valores debe ser un número.')
             return False
         
-        sigma_val = float(self.sigma.text())
+        if not 10 <= n <= self.max_size:
+            max_text = f'{self.max_size:,}'.replace(',', '.')
+            self.error_label.setText(f'Error: La cantidad de valores debe estar entre 10 y {max_text}.')
+            return False
         
-        if sigma_val <= 0:
-            self.error_label.setText('Error: La desviación estándar debe ser mayor que 0.')
+        try:
+            parse_seed(self.seed_input.text())
+        except ValueError as e:
+            self.error_label.setText(f'Error: {e}')
             return False
         
         self.error_label.setText('')
         return True
     
-    def _get_data(self):  # type: ignore
+    def on_run(self):
         if not self._check_inputs():
-            return []
+            return
+        
+        self.job_id += 1
+        seed = parse_seed(self.seed_input.text())
+        if seed is None:
+            seed = new_seed()
+        job = RandomnessJob(
+            self.job_id, int(float(self.n_input.text())), seed, self.source_combo.currentData(), self.alpha_input.value()
+        )
+        job.metrics = INSTRUMENTATION.start_run('randomness', source=job.kind, n=job.n)
+        job.signals.finished.connect(self.on_job_finished)
+        job.signals.failed.connect(self.on_job_failed)
+        
+        self.metrics = job.metrics
+        self.running = True
+        self.run_button.setText('Ejecutando pruebas…')
+        QThreadPool.globalInstance().start(job)  # type: ignore
+    
+    def _reset_job_state(self):
+        self.running = False
+        self.run_button.setText('Ejecutar pruebas')
+    
+    def on_job_failed(self, job_id: int, message: str):
+        if job_id != self.job_id:
+            return
+        self.metrics.finish()
+        self._reset_job_state()
+        self.error_label.setText(f'Error: {message}')
+    
+    def on_job_finished(self, job_id: int, report: dict):
+        if job_id != self.job_id:
+            return
+        self._reset_job_state()
+        show_with_metrics(self.metrics, lambda: self._show_report(report))
+    
+    def _show_report(self, report: dict):
+        tests = report['tests']
+        passed = sum(test['passed'] for test in tests)
+        self.seed_input.setPlaceholderText(f'Semilla (opcional, última usada: {report["seed"]})')
+        self.summary_label.setText(
+            f'{passed} de {len(tests)} pruebas superadas con α = {report["alpha"]:g} (n = {report["n"]}, semilla {report["seed"]}).'
+        )
+        
+        import pandas as pd
         
-        n = int(self.n_input.text())
-        mu = float(self.mu.text())
-        sigma = float(self.sigma.text())
-        return generate_random_variable_distribution(n, normal_distribution_generator_box_muller, ndigits=4, mu=mu, sigma=sigma)
+        frame = pd.DataFrame({
+            'Prueba': [test['label'] for test in tests],
+            'Estadístico': [round(test['statistic'], 4) for test in tests],
+            'Grados de libertad': [test['dof'] if test['dof'] is not None else '-' for test in tests],
+            'p-valor': [round(test['p_value'], 4) for test in tests],
+            'Resultado': ['Supera' if test['passed'] else 'No supera' for test in tests],
+        })
+        with INSTRUMENTATION.stage('table_model'):
+            self.table.setModel(PandasModel(frame))
+        with INSTRUMENTATION.stage('resize_columns'):
+            self.table.resizeColumnsToContents()
 
-class Tab(QWidget):
-    def __init__(self, left_panel, update_plot, parent=None):
-        super().__init__(parent)
 
-        self.left_panel = left_panel(self.update_plot_data)
+class ComparisonTab(QWidget):
+    """Overlays the samples kept in the sample cache, of any tab, on one chart.
+
+    Every sample is reduced once by plots.summarize and the summary is memoized in its cache
+    entry, so switching samples or between densities, Q–Q and P–P only redraws small arrays.
+    """
+
+    def __init__(self, cache: SampleCache | None = None, parent=None):
+        super().__init__(parent)
+        self.cache = cache if cache is not None else SAMPLE_CACHE
         
         layout = QHBoxLayout(self)
-        layout.addWidget(self.left_panel)
+        controls = QVBoxLayout()
         
-        self.right_panel = RightPanel([], self.update_dist_table, left_panel=self.left_panel)
+        self.sample_list = QListWidget(self)
+        self.sample_list.itemChanged.connect(self.update_plot)
+        controls.addWidget(self.sample_list)
+        
+        self.refresh_button = QPushButton('Actualizar lista', self)
+        self.refresh_button.clicked.connect(self.refresh)
+        controls.addWidget(self.refresh_button)
+        
+        self.kind_combo = QComboBox(self)
+        for kind, (label, _) in PLOT_KINDS.items():
+            self.kind_combo.addItem(label, kind)
+        self.kind_combo.currentIndexChanged.connect(self.update_plot)
+        controls.addWidget(self.kind_combo)
+        
+        self.theoretical_check = QCheckBox('Mostrar curvas teóricas', self)
+        self.theoretical_check.setChecked(True)
+        self.theoretical_check.toggled.connect(self.update_plot)
+        controls.addWidget(self.theoretical_check)
+        
+        self.info_label = QLabel('', self)
+        self.info_label.setWordWrap(True)
+        controls.addWidget(self.info_label)
+        layout.addLayout(controls)
+        
+        from charts import new_canvas
+        
+        self.canvas = new_canvas(7, 5)
+        self.ax = self.canvas.figure.get_axes()[0]
+        layout.addWidget(self.canvas, stretch=1)
         
-        layout.addWidget(self.right_panel)
-
         self.setLayout(layout)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+    
+    def _label(self, key: tuple) -> str:
+        name, params, n, seed = key[:4]
+        distribution = for_callback_name(name)
+        if distribution is None:
+            return f'{name} n = {n}, semilla {seed}'
         
-    def update_plot_data(self, data):
-        return self.right_panel.update_plot_data(data)
+        label = f'{distribution.label} ({", ".join(f"{param}={value:g}" for param, value in params)})'
+        sampler = next((sampler for sampler, callback in distribution.samplers.items() if callback.__name__ == name), None)
+        if sampler is not None:
+            label += f' [{SAMPLER_LABELS.get(sampler, sampler)}]'
+        return f'{label} n = {n}, semilla {seed}'
     
-    def update_dist_table(self, counts, bin_edges):
-        self.left_panel.update_dist_table(counts, bin_edges)
+    def refresh(self):
+        """Lists the cached samples, most recent first, keeping the ones that were checked."""
+        checked = {self.sample_list.item(i).data(Qt.UserRole) for i in range(self.sample_list.count())  # type: ignore
+                   if self.sample_list.item(i).checkState() == Qt.Checked}  # type: ignore
+        
+        self.sample_list.blockSignals(True)
+        self.sample_list.clear()
+        for entry in reversed(self.cache.entries()):
+            item = QListWidgetItem(self._label(entry.key))
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)  # type: ignore
+            item.setCheckState(Qt.Checked if entry.key in checked else Qt.Unchecked)  # type: ignore
+            item.setData(Qt.UserRole, entry.key)  # type: ignore
+            self.sample_list.addItem(item)
+        self.sample_list.blockSignals(False)
+        
+        if self.sample_list.count() == 0:
+            self.info_label.setText('No hay muestras generadas. Las muestras que se generan en las otras pestañas aparecen aquí.')
+        else:
+            self.info_label.setText('Marque las muestras a comparar.')
+        self.update_plot()
+    
+    def _summary(self, key: tuple):
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        
+        distribution = for_callback_name(key[0])
+        return entry.memo('comparison', lambda: summarize(
+            self._label(key), entry.binning.sorted_values(), distribution, dict(key[1])
+        ))
+    
+    def update_plot(self):
+        keys = [self.sample_list.item(i).data(Qt.UserRole) for i in range(self.sample_list.count())  # type: ignore
+                if self.sample_list.item(i).checkState() == Qt.Checked]  # type: ignore
+        summaries = [summary for summary in map(self._summary, keys) if summary is not None]
+        
+        self.ax.clear()
+        _, draw = PLOT_KINDS[self.kind_combo.currentData()]
+        draw(self.ax, summaries, self.theoretical_check.isChecked())
+        if summaries:
+            self.ax.legend(fontsize=8)
+        self.canvas.draw_idle()
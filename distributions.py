@@ -0,0 +1,327 @@
+import math
+
+import numpy as np
+
+from fit import gamma_cdf, lognormal_cdf, negative_exponential_cdf, normal_cdf, poisson_cdf, triangular_cdf, uniform_cdf
+from generators import (
+    gamma_distribution_generator, generate_random_variable_distribution, lognormal_distribution_generator,
+    negative_exponential_distribution_generator, normal_distribution_generator, normal_distribution_generator_box_muller,
+    normal_distribution_generator_polar, normal_distribution_generator_ziggurat, poisson_distribution_generator, triangular_distribution_generator, uniform_distribution_generator
+)
+
+
+class Parameter:
+    """A parameter of a distribution, with its type and the bounds its values must respect.
+
+    `label` is shown as the placeholder of its input and is the subject of the error messages.
+    """
+
+    def __init__(self, name: str, label: str, kind: type = float, low: float | None = None, high: float | None = None,
+                 open_bounds: bool = True):
+        self.name = name
+        self.label = label
+        self.kind = kind
+        self.low = low
+        self.high = high
+        self.open_bounds = open_bounds
+
+    def parse(self, value) -> float | int:
+        """Converts a text or number to the parameter type and checks its bounds.
+
+        Raises:
+            ValueError: With a message for the user when the value is not valid.
+        """
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{self.label} debe ser un número.') from None
+
+        if not math.isfinite(number):
+            raise ValueError(f'{self.label} debe ser un número finito.')
+        if self.kind is int:
+            if not number.is_integer():
+                raise ValueError(f'{self.label} debe ser un número entero.')
+            number = int(number)
+
+        comparison = 'mayor que' if self.open_bounds else 'mayor o igual que'
+        if self.low is not None and (number <= self.low if self.open_bounds else number < self.low):
+            raise ValueError(f'{self.label} debe ser {comparison} {self.low:g}.')
+        comparison = 'menor que' if self.open_bounds else 'menor o igual que'
+        if self.high is not None and (number >= self.high if self.open_bounds else number > self.high):
+            raise ValueError(f'{self.label} debe ser {comparison} {self.high:g}.')
+        return number
+
+
+class Distribution:
+    """Everything the application needs to know about a distribution.
+
+    Args:
+        name (str): The key used by the CLI, the cache and the batch files.
+        label (str): The name shown in the window.
+        callback (function): The scalar generator; the samples are drawn by its batch counterpart in
+            generators.BATCH_GENERATORS.
+        params (list[Parameter]): The parameters, in the order they are asked for.
+        cdf (function): The cumulative distribution function, called as cdf(x, **params). For a discrete
+            distribution it is P(X < x), see fit.poisson_cdf.
+        pdf (function): The density (the probability mass for a discrete distribution), called as pdf(x, **params).
+        mean (function): The expected value, called as mean(**params).
+        variance (function): The variance, called as variance(**params).
+        support (function): The (lower, upper) bounds of the values, infinite when unbounded.
+        check (function, optional): Validates the parameters together, returns an error message or None.
+        discrete (bool, optional): Whether the values are integers. The Kolmogorov-Smirnov test is skipped for them.
+        samplers (dict, optional): Other scalar generators of the same distribution by name, e.g. another method.
+        sampler (str, optional): The name of the method of `callback` among the samplers. Defaults to 'default'.
+    """
+
+    def __init__(self, name: str, label: str, callback, params: list[Parameter], cdf, pdf, mean, variance, support,
+                 check=None, discrete: bool = False, samplers: dict | None = None, sampler: str = 'default'):
+        self.name = name
+        self.label = label
+        self.callback = callback
+        self.params = params
+        self.cdf = cdf
+        self.pdf = pdf
+        self.mean = mean
+        self.variance = variance
+        self.support = support
+        self.check = check
+        self.discrete = discrete
+        self.samplers = samplers if samplers is not None else {}
+        self.sampler = sampler
+
+    @property
+    def param_names(self) -> list[str]:
+        return [param.name for param in self.params]
+
+    def sampler_choices(self) -> dict:
+        """Every scalar generator of the distribution by method name, the default one first."""
+        return {self.sampler: self.callback, **self.samplers}
+
+    def parse(self, values: dict) -> dict:
+        """Converts the raw values (texts from the window or numbers from the CLI) into parameters.
+
+        Raises:
+            ValueError: With a message for the user when a value is missing or not valid.
+        """
+        params = {}
+        for param in self.params:
+            if param.name not in values:
+                raise ValueError(f'Falta el parámetro {param.label}.')
+            params[param.name] = param.parse(values[param.name])
+
+        message = self.check(**params) if self.check is not None else None
+        if message is not None:
+            raise ValueError(message)
+        
+        # The theoretical moments are shown with every sample and the histogram bounds of a streamed
+        # run are searched from them, e.g. the lognormal variance overflows once sigma is about 19.
+        try:
+            moments = (self.mean(**params), self.variance(**params))
+        except (OverflowError, ZeroDivisionError):
+            moments = (math.inf,)
+        if not all(map(math.isfinite, moments)):
+            raise ValueError('La media o la varianza de la distribución con estos parámetros no son números representables.')
+        return params
+
+    def sample(self, n: int, ndigits: int = -1, rng=None, **params) -> np.ndarray:
+        return generate_random_variable_distribution(n, self.callback, ndigits, rng=rng, **params)
+
+    def quantile(self, q: float, **params) -> float:
+        """The value x with cdf(x) = q, found by bisection between bounds grown from the mean."""
+        return float(self.quantiles(np.array([q]), **params)[0])
+
+    def quantiles(self, q: np.ndarray, **params) -> np.ndarray:
+        """quantile for an array of probabilities, bisecting all of them at once.
+
+        The bounds are grown from the mean until they bracket the smallest and the largest
+        probability, then every step halves all the intervals with one call to the cdf.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        low, high = self.support(**params)
+        center = self.mean(**params)
+        span = math.sqrt(self.variance(**params)) or 1.0
+        cdf = lambda x: float(self.cdf(np.array([x]), **params)[0])
+
+        if math.isinf(low):
+            low = center - span
+            while cdf(low) > q.min(initial=1.0):
+                low = center - 2 * (center - low)
+        if math.isinf(high):
+            high = center + span
+            while cdf(high) < q.max(initial=0.0):
+                high = center + 2 * (high - center)
+
+        low = np.full(q.shape, low, dtype=np.float64)
+        high = np.full(q.shape, high, dtype=np.float64)
+        for _ in range(200):
+            middle = (low + high) / 2
+            if np.all((middle == low) | (middle == high)):
+                break
+            below = self.cdf(middle, **params) < q
+            low = np.where(below, middle, low)
+            high = np.where(below, high, middle)
+        return high
+
+    def stream_range(self, n: int, **params) -> tuple[float, float]:
+        """Fixed histogram bounds for a streamed run, before any value is generated.
+
+        Bounded ends use the support. Unbounded ends use the quantiles 1/n and 1 - 1/n, which is
+        about where the minimum and maximum of n samples fall.
+        """
+        tail = 1 / max(n, 2)
+        low, high = self.support(**params)
+        if math.isinf(low):
+            low = self.quantile(tail, **params)
+        if math.isinf(high):
+            high = self.quantile(1 - tail, **params)
+        return low, high
+
+
+def uniform_pdf(x: np.ndarray, min: float, max: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return np.where((x >= min) & (x <= max), 1 / (max - min), 0.0)
+
+
+def negative_exponential_pdf(x: np.ndarray, lamb: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return np.where(x >= 0, lamb * np.exp(-lamb * np.maximum(x, 0.0)), 0.0)
+
+
+def normal_pdf(x: np.ndarray, mu: float, sigma: float) -> np.ndarray:
+    z = (np.asarray(x, dtype=np.float64) - mu) / sigma
+    return np.exp(-0.5 * z * z) / (sigma * math.sqrt(2 * math.pi))
+
+
+def poisson_pmf(x: np.ndarray, lamb: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    k = np.maximum(np.round(x), 0.0)
+    log_factorial = np.array([math.lgamma(value + 1) for value in k.ravel()]).reshape(k.shape)
+    return np.where((x == k), np.exp(k * math.log(lamb) - lamb - log_factorial), 0.0)
+
+
+def gamma_pdf(x: np.ndarray, k: float, lamb: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    positive = np.maximum(x, np.finfo(np.float64).tiny)
+    density = np.exp(k * math.log(lamb) + (k - 1) * np.log(positive) - lamb * positive - math.lgamma(k))
+    return np.where(x > 0, density, 0.0)
+
+
+def triangular_pdf(x: np.ndarray, min: float, mode: float, max: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rising = 2 * (x - min) / ((max - min) * (mode - min))
+        falling = 2 * (max - x) / ((max - min) * (max - mode))
+    density = np.where(x <= mode, np.nan_to_num(rising), np.nan_to_num(falling))
+    return np.where((x >= min) & (x <= max), density, 0.0)
+
+
+def lognormal_pdf(x: np.ndarray, mu: float, sigma: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    positive = np.maximum(x, np.finfo(np.float64).tiny)
+    return np.where(x > 0, normal_pdf(np.log(positive), mu, sigma) / positive, 0.0)
+
+
+def _check_uniform(min: float, max: float) -> str | None:
+    return 'El valor mínimo debe ser menor que el valor máximo.' if min >= max else None
+
+
+def _check_triangular(min: float, mode: float, max: float) -> str | None:
+    if min >= max:
+        return 'El valor mínimo debe ser menor que el valor máximo.'
+    if not min <= mode <= max:
+        return 'La moda debe estar entre el mínimo y el máximo.'
+    return None
+
+
+DISTRIBUTIONS = {distribution.name: distribution for distribution in [
+    Distribution(
+        'uniform', 'Uniforme', uniform_distribution_generator,
+        [Parameter('min', 'Mínimo valor de la muestra'), Parameter('max', 'Máximo valor de la muestra')],
+        uniform_cdf, uniform_pdf,
+        mean=lambda min, max: (min + max) / 2,
+        variance=lambda min, max: (max - min) ** 2 / 12,
+        support=lambda min, max: (min, max),
+        check=_check_uniform,
+    ),
+    Distribution(
+        'exponential', 'Exponencial', negative_exponential_distribution_generator,
+        [Parameter('lamb', 'Lambda (λ)', low=0)],
+        negative_exponential_cdf, negative_exponential_pdf,
+        mean=lambda lamb: 1 / lamb,
+        variance=lambda lamb: 1 / lamb ** 2,
+        support=lambda lamb: (0.0, math.inf),
+    ),
+    Distribution(
+        'normal', 'Normal', normal_distribution_generator_box_muller,
+        [Parameter('mu', 'Media (μ)'), Parameter('sigma', 'Desviación estándar (σ)', low=0)],
+        normal_cdf, normal_pdf,
+        mean=lambda mu, sigma: mu,
+        variance=lambda mu, sigma: sigma ** 2,
+        support=lambda mu, sigma: (-math.inf, math.inf),
+        samplers={
+            'convolution': normal_distribution_generator,
+            'polar': normal_distribution_generator_polar,
+            'ziggurat': normal_distribution_generator_ziggurat,
+        },
+        sampler='box_muller',
+    ),
+    Distribution(
+        'poisson', 'Poisson', poisson_distribution_generator,
+        # The sample table (generators._poisson_table) and the cdf both grow as sqrt(lambda).
+        [Parameter('lamb', 'Lambda (λ)', low=0, high=1e6)],
+        poisson_cdf, poisson_pmf,
+        mean=lambda lamb: lamb,
+        variance=lambda lamb: lamb,
+        support=lambda lamb: (0.0, math.inf),
+        discrete=True,
+    ),
+    Distribution(
+        'gamma', 'Gamma (Erlang)', gamma_distribution_generator,
+        [Parameter('k', 'Forma (k)', low=0), Parameter('lamb', 'Tasa (λ)', low=0)],
+        gamma_cdf, gamma_pdf,
+        mean=lambda k, lamb: k / lamb,
+        variance=lambda k, lamb: k / lamb ** 2,
+        support=lambda k, lamb: (0.0, math.inf),
+    ),
+    Distribution(
+        'triangular', 'Triangular', triangular_distribution_generator,
+        [Parameter('min', 'Mínimo valor de la muestra'), Parameter('mode', 'Moda'), Parameter('max', 'Máximo valor de la muestra')],
+        triangular_cdf, triangular_pdf,
+        mean=lambda min, mode, max: (min + mode + max) / 3,
+        variance=lambda min, mode, max: (min ** 2 + mode ** 2 + max ** 2 - min * mode - min * max - mode * max) / 18,
+        support=lambda min, mode, max: (min, max),
+        check=_check_triangular,
+    ),
+    Distribution(
+        'lognormal', 'Lognormal', lognormal_distribution_generator,
+        [Parameter('mu', 'Media del logaritmo (μ)'), Parameter('sigma', 'Desviación estándar del logaritmo (σ)', low=0)],
+        lognormal_cdf, lognormal_pdf,
+        mean=lambda mu, sigma: math.exp(mu + sigma ** 2 / 2),
+        variance=lambda mu, sigma: math.expm1(sigma ** 2) * math.exp(2 * mu + sigma ** 2),
+        support=lambda mu, sigma: (0.0, math.inf),
+    ),
+]}
+
+
+SAMPLER_LABELS = {
+    'box_muller': 'Box–Muller',
+    'convolution': 'Convolución (12 uniformes)',
+    'polar': 'Polar de Marsaglia',
+    'ziggurat': 'Ziggurat',
+}
+
+
+def for_callback(callback) -> Distribution | None:
+    """The registered distribution a scalar generator (or one of its alternative samplers) belongs to."""
+    for distribution in DISTRIBUTIONS.values():
+        if callback is distribution.callback or callback in distribution.samplers.values():
+            return distribution
+    return None
+
+
+def for_callback_name(name: str) -> Distribution | None:
+    """for_callback from the name of the generator, as kept in the keys of the sample cache."""
+    for distribution in DISTRIBUTIONS.values():
+        if name == distribution.callback.__name__ or name in (sampler.__name__ for sampler in distribution.samplers.values()):
+            return distribution
+    return None
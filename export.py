@@ -0,0 +1,57 @@
+import numpy as np
+
+
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def format_block(block: np.ndarray, sep: str = '\t', decimal: str = '.') -> str:
+    """Formats a 2-D block as delimited text, with the same digits the tables show.
+
+    The numbers are converted with a single tolist() and the decimal point is swapped in one
+    str.replace over the whole text, instead of formatting and replacing cell by cell.
+
+    Args:
+        block (np.ndarray): The values to format, one text line per row.
+        sep (str, optional): The column separator. Defaults to '\\t'.
+        decimal (str, optional): The decimal separator. Defaults to '.'.
+
+    Returns:
+        str: The formatted rows joined with newlines, without a trailing newline.
+    """
+    if block.ndim == 1:
+        block = block.reshape(-1, 1)
+
+    if block.shape[1] == 1:
+        text = '\n'.join(map(str, block[:, 0].tolist()))
+    else:
+        text = '\n'.join(sep.join(map(str, row)) for row in block.tolist())
+
+    return text if decimal == '.' else text.replace('.', decimal)
+
+
+def default_separator(path: str, decimal: str = '.') -> str:
+    """Tab for .tsv/.txt files; for .csv, a semicolon when the decimal separator is a comma, as Excel expects."""
+    if path.lower().endswith('.csv'):
+        return ';' if decimal == ',' else ','
+    return '\t'
+
+
+def write_delimited(path: str, array: np.ndarray, columns: list[str], sep: str | None = None, decimal: str = '.',
+                    chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Streams an array to a CSV/TSV file in chunks of rows, so the whole text never sits in memory.
+
+    Args:
+        path (str): The destination file.
+        array (np.ndarray): A 1-D or 2-D array with one row per line.
+        columns (list[str]): The header of the file.
+        sep (str | None, optional): The column separator. Defaults to None, which picks it from the extension.
+        decimal (str, optional): The decimal separator. Defaults to '.'.
+        chunk_rows (int, optional): The number of rows formatted at a time. Defaults to EXPORT_CHUNK_ROWS.
+    """
+    sep = sep if sep is not None else default_separator(path, decimal)
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(sep.join(columns) + '\n')
+        for start in range(0, len(array), chunk_rows):
+            f.write(format_block(array[start:start + chunk_rows], sep, decimal))
+            f.write('\n')
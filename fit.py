@@ -0,0 +1,313 @@
+import math
+
+import numpy as np
+
+from storage import grid_ceil
+
+
+MIN_EXPECTED_FREQUENCY = 5
+
+
+def erf(x: np.ndarray) -> np.ndarray:
+    """Vectorized error function (Abramowitz and Stegun 7.1.26, absolute error below 1.5e-7)."""
+    x = np.asarray(x, dtype=np.float64)
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+
+def uniform_cdf(x: np.ndarray, min: float, max: float) -> np.ndarray:
+    return np.clip((np.asarray(x, dtype=np.float64) - min) / (max - min), 0.0, 1.0)
+
+
+def negative_exponential_cdf(x: np.ndarray, lamb: float) -> np.ndarray:
+    return -np.expm1(-lamb * np.maximum(np.asarray(x, dtype=np.float64), 0.0))
+
+
+def normal_cdf(x: np.ndarray, mu: float, sigma: float) -> np.ndarray:
+    return 0.5 * (1.0 + erf((np.asarray(x, dtype=np.float64) - mu) / (sigma * math.sqrt(2.0))))
+
+
+def gamma_cdf(x: np.ndarray, k: float, lamb: float) -> np.ndarray:
+    return regularized_gamma_p(k, lamb * np.maximum(np.asarray(x, dtype=np.float64), 0.0))
+
+
+def poisson_cdf(x: np.ndarray, lamb: float) -> np.ndarray:
+    """P(X < x), the left-continuous CDF, so an interval [a, b) of the histogram expects P(a <= X < b)."""
+    upper = np.ceil(np.asarray(x, dtype=np.float64))
+    return np.where(upper > 0, 1.0 - regularized_gamma_p(np.maximum(upper, 1.0), lamb), 0.0)
+
+
+def triangular_cdf(x: np.ndarray, min: float, mode: float, max: float) -> np.ndarray:
+    x = np.clip(np.asarray(x, dtype=np.float64), min, max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lower = (x - min) ** 2 / ((max - min) * (mode - min))
+        upper = 1.0 - (max - x) ** 2 / ((max - min) * (max - mode))
+    return np.where(x <= mode, np.nan_to_num(lower), np.nan_to_num(upper, nan=1.0))
+
+
+def lognormal_cdf(x: np.ndarray, mu: float, sigma: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return np.where(x > 0, normal_cdf(np.log(np.maximum(x, 0.0)), mu, sigma), 0.0)
+
+
+def _lgamma(a: np.ndarray) -> np.ndarray:
+    """math.lgamma over an array, evaluated once per distinct value."""
+    unique, inverse = np.unique(a, return_inverse=True)
+    return np.array([math.lgamma(value) for value in unique])[inverse].reshape(a.shape)
+
+
+def _gamma_iterations(a: float) -> int:
+    """Iteration limit of the incomplete gamma series and continued fraction.
+
+    Near x = a both need a number of terms that grows as sqrt(a), about 8.3 sqrt(a) for a relative
+    error of 1e-15, so a fixed limit is not enough for e.g. a Poisson cdf with lambda = 10^6.
+    """
+    return 100 + int(10 * math.sqrt(max(a, 1.0)))
+
+
+def _not_converged(a) -> ArithmeticError:
+    return ArithmeticError(f'La función gamma incompleta no convergió para a = {float(np.max(a)):g}.')
+
+
+def regularized_gamma_p(a, x) -> np.ndarray:
+    """Lower regularized incomplete gamma function P(a, x) over arrays.
+
+    Same series and continued fraction as regularized_gamma_q, iterated on every element at once
+    until the slowest one converges.
+
+    Raises:
+        ArithmeticError: When an element does not converge within _gamma_iterations(a) terms.
+    """
+    a, x = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(x, dtype=np.float64))
+    result = np.zeros(a.shape)
+    series = (x > 0) & (x < a + 1)
+    fraction = (x > 0) & ~series
+
+    if series.any():
+        sa, sx = a[series], x[series]
+        term = 1.0 / sa
+        total = term.copy()
+        denominator = sa.copy()
+        for _ in range(_gamma_iterations(float(sa.max()))):
+            denominator += 1
+            term *= sx / denominator
+            total += term
+            if np.all(np.abs(term) < np.abs(total) * 1e-15):
+                break
+        else:
+            raise _not_converged(sa)
+        result[series] = total * np.exp(-sx + sa * np.log(sx) - _lgamma(sa))
+
+    if fraction.any():
+        fa, fx = a[fraction], x[fraction]
+        tiny = 1e-300
+        b = fx + 1 - fa
+        c = np.full(fa.shape, 1 / tiny)
+        d = 1 / b
+        h = d.copy()
+        for i in range(1, _gamma_iterations(float(fa.max()))):
+            an = -i * (i - fa)
+            b += 2
+            d = an * d + b
+            d = np.where(np.abs(d) < tiny, tiny, d)
+            c = b + an / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            d = 1 / d
+            delta = d * c
+            h *= delta
+            if np.all(np.abs(delta - 1) < 1e-15):
+                break
+        else:
+            raise _not_converged(fa)
+        result[fraction] = 1.0 - np.exp(-fx + fa * np.log(fx) - _lgamma(fa)) * h
+
+    return result
+
+
+def regularized_gamma_q(a: float, x: float) -> float:
+    """Upper regularized incomplete gamma function Q(a, x) (Numerical Recipes gser/gcf).
+
+    Raises:
+        ArithmeticError: When it does not converge within _gamma_iterations(a) terms.
+    """
+    if x <= 0:
+        return 1.0
+
+    if x < a + 1:
+        term = total = 1.0 / a
+        denominator = a
+        for _ in range(_gamma_iterations(a)):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        else:
+            raise _not_converged(a)
+        return 1.0 - total * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, _gamma_iterations(a)):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    else:
+        raise _not_converged(a)
+    return math.exp(-x + a * math.log(x) - math.lgamma(a)) * h
+
+
+def chi_square_sf(statistic: float, dof: int) -> float:
+    """P(X > statistic) for a chi-square variable with dof degrees of freedom."""
+    return regularized_gamma_q(dof / 2, statistic / 2) if dof > 0 else math.nan
+
+
+def kolmogorov_sf(statistic: float, n: int) -> float:
+    """Asymptotic p-value of the one-sample Kolmogorov-Smirnov statistic (Numerical Recipes probks)."""
+    root = math.sqrt(n)
+    lam = (root + 0.12 + 0.11 / root) * statistic
+    if lam < 0.2:
+        return 1.0
+
+    total = 0.0
+    for j in range(1, 101):
+        term = 2 * (-1) ** (j - 1) * math.exp(-2 * j * j * lam * lam)
+        total += term
+        if abs(term) < 1e-12:
+            break
+    return min(max(total, 0.0), 1.0)
+
+
+def rounded_edges(x: np.ndarray, ndigits: int) -> np.ndarray:
+    """Where the continuous cdf gives P(round(X, ndigits) < x).
+
+    A value rounds to at least the first multiple g of h = 10^-ndigits at or above x exactly when it
+    is at least g - h / 2. Testing the rounded samples against the cdf at these points compares them
+    with the distribution they really follow; with the plain cdf, a grid that is not small against
+    the scale of the distribution (e.g. an exponential with lambda = 100 at 4 decimals) rejects
+    correct samples.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if ndigits < 0:
+        return x
+    return (grid_ceil(x, ndigits) - 0.5) / 10.0 ** ndigits
+
+
+def expected_frequencies(bin_edges: np.ndarray, n: int, cdf, ndigits: int = -1, **kwargs) -> np.ndarray:
+    """Expected count of every interval; the probability below the first and above the last edge goes to the outer intervals.
+
+    With ndigits, the intervals count values rounded to that many decimals, see rounded_edges.
+    """
+    bin_edges = rounded_edges(bin_edges, ndigits)
+    probabilities = np.diff(cdf(bin_edges, **kwargs))
+    probabilities[0] += cdf(bin_edges[:1], **kwargs)[0]
+    probabilities[-1] += 1.0 - cdf(bin_edges[-1:], **kwargs)[0]
+    return probabilities * n
+
+
+def merge_bins(observed: np.ndarray, expected: np.ndarray, min_expected: float = MIN_EXPECTED_FREQUENCY):
+    """Joins neighbouring intervals from left to right until each group expects at least min_expected values.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The observed and expected counts of the groups and,
+            for every original interval, the index of the group it ended up in.
+    """
+    groups = np.zeros(len(expected), dtype=np.int64)
+    group = 0
+    accumulated = 0.0
+    for i, value in enumerate(expected):
+        groups[i] = group
+        accumulated += value
+        if accumulated >= min_expected and i < len(expected) - 1:
+            group += 1
+            accumulated = 0.0
+
+    # A trailing group that is still too small is joined to the previous one.
+    if accumulated < min_expected and group > 0:
+        groups[groups == group] = group - 1
+
+    return np.bincount(groups, weights=observed), np.bincount(groups, weights=expected), groups
+
+
+def chi_square_test(counts: np.ndarray, bin_edges: np.ndarray, cdf, estimated_params: int = 0, ndigits: int = -1,
+                    **kwargs) -> dict:
+    """Chi-square goodness-of-fit test of a frequency table against a distribution.
+
+    Args:
+        counts (np.ndarray): The observed frequency of every interval.
+        bin_edges (np.ndarray): The edges of the intervals.
+        cdf (function): The cumulative distribution function, called as cdf(x, **kwargs).
+        estimated_params (int, optional): How many parameters were estimated from the sample. Defaults to 0.
+        ndigits (int, optional): The decimals the sample was rounded to, -1 when it was not. Defaults to -1.
+
+    Returns:
+        dict: The expected frequency and chi-square contribution of every interval, the statistic,
+            the degrees of freedom and the p-value after merging intervals with expected < 5.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    n = int(counts.sum())
+    expected = expected_frequencies(bin_edges, n, cdf, ndigits, **kwargs)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        contributions = np.where(expected > 0, (counts - expected) ** 2 / expected, 0.0)
+
+    merged_observed, merged_expected, _ = merge_bins(counts, expected)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        statistic = float(np.sum(np.where(merged_expected > 0, (merged_observed - merged_expected) ** 2 / merged_expected, 0.0)))
+    dof = len(merged_expected) - 1 - estimated_params
+
+    return {
+        'expected': expected,
+        'contributions': contributions,
+        'statistic': statistic,
+        'dof': dof,
+        'p_value': chi_square_sf(statistic, dof),
+        'merged_bins': len(merged_expected),
+    }
+
+
+def ks_test(data: np.ndarray, cdf, sorted_data: np.ndarray | None = None, ndigits: int = -1, **kwargs) -> dict:
+    """One-sample Kolmogorov-Smirnov test of a sample against a distribution.
+
+    A sample rounded to ndigits decimals follows a step cdf, which is P(X < x + h / 2) at a grid
+    point x and P(X < x - h / 2) just before it, h = 10^-ndigits. Comparing the last of equal values
+    with the first and the first with the second gives D over the ties.
+
+    Args:
+        data (np.ndarray): The sample.
+        cdf (function): The cumulative distribution function, called as cdf(x, **kwargs).
+        sorted_data (np.ndarray | None, optional): The sample already sorted, to skip the sort. Defaults to None.
+        ndigits (int, optional): The decimals the sample was rounded to, -1 when it was not. Defaults to -1.
+
+    Returns:
+        dict: The statistic D and its asymptotic p-value.
+    """
+    sorted_data = sorted_data if sorted_data is not None else np.sort(data)
+    n = len(sorted_data)
+    if n == 0:
+        return {'statistic': math.nan, 'p_value': math.nan}
+
+    if ndigits < 0:
+        upper = lower = cdf(sorted_data, **kwargs)
+    else:
+        half_step = 10.0 ** -ndigits / 2
+        upper = cdf(np.asarray(sorted_data, dtype=np.float64) + half_step, **kwargs)
+        lower = cdf(np.asarray(sorted_data, dtype=np.float64) - half_step, **kwargs)
+    steps = np.arange(1, n + 1) / n
+    statistic = float(max(np.max(steps - upper), np.max(lower - (steps - 1 / n))))
+    return {'statistic': statistic, 'p_value': kolmogorov_sf(statistic, n)}
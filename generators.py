@@ -1,7 +1,10 @@
 import random as rnd
 import math
+from functools import lru_cache
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+from rng import make_rng
 
 
 def validate_input_number(n: int, min: int, max: int | None = None, message: str | None = None) -> int:
@@ -43,7 +46,7 @@ def normal_distribution_generator(mu: float, sigma: float) -> float:
 
 
 def normal_distribution_generator_box_muller(mu: float, sigma: float) -> float:
-    """Generates a random number from a normal distribution using de convolution method.
+    """Generates a random number from a normal distribution using the Box-Muller method.
 
     Args:
         mu (float): The mean of the distribution.
@@ -54,8 +57,443 @@ def normal_distribution_generator_box_muller(mu: float, sigma: float) -> float:
     """
     return math.sqrt(-2.0 * math.log(rnd.random())) * math.cos(2.0 * math.pi * rnd.random()) * sigma + mu
 
-def generate_random_variable_distribution(n: int, callback, ndigits: int = -1, **kwargs) -> np.ndarray:
-    """Generates a random variable distribution.
+
+def normal_distribution_generator_polar(mu: float, sigma: float) -> float:
+    """Generates a random number from a normal distribution using the Marsaglia polar method.
+
+    A point uniform in the square [-1, 1)^2 is drawn until it falls inside the unit circle (a
+    probability of pi / 4), which avoids the sine and cosine of Box-Muller.
+
+    Args:
+        mu (float): The mean of the distribution.
+        sigma (float): The standard deviation of the distribution.
+
+    Returns:
+        float: A random number from the normal distribution.
+    """
+    while True:
+        u = 2 * rnd.random() - 1
+        v = 2 * rnd.random() - 1
+        s = u * u + v * v
+        if 0 < s < 1:
+            return u * math.sqrt(-2 * math.log(s) / s) * sigma + mu
+
+
+# Marsaglia and Tsang's ziggurat for the normal density f(x) = exp(-x^2 / 2), with 128 layers of
+# equal area ZIGGURAT_AREA. ZIGGURAT_X[i] is the width of layer i; the base layer 0 also covers the
+# tail beyond ZIGGURAT_R, so its width is the area divided by f(ZIGGURAT_R).
+ZIGGURAT_LAYERS = 128
+ZIGGURAT_R = 3.442619855899
+ZIGGURAT_AREA = 9.91256303526217e-3
+
+
+def _ziggurat_tables() -> tuple[np.ndarray, np.ndarray]:
+    x = np.empty(ZIGGURAT_LAYERS + 1)
+    x[0] = ZIGGURAT_AREA / math.exp(-0.5 * ZIGGURAT_R ** 2)
+    x[1] = ZIGGURAT_R
+    for i in range(2, ZIGGURAT_LAYERS):
+        x[i] = math.sqrt(-2 * math.log(ZIGGURAT_AREA / x[i - 1] + math.exp(-0.5 * x[i - 1] ** 2)))
+    x[ZIGGURAT_LAYERS] = 0.0
+    return x, np.exp(-0.5 * x * x)
+
+
+ZIGGURAT_X, ZIGGURAT_F = _ziggurat_tables()
+_ZIGGURAT_X_LIST, _ZIGGURAT_F_LIST = ZIGGURAT_X.tolist(), ZIGGURAT_F.tolist()
+
+
+def normal_distribution_generator_ziggurat(mu: float, sigma: float) -> float:
+    """Generates a random number from a normal distribution using the ziggurat method.
+
+    A random layer of the ziggurat is picked and a point inside it; about 98.8% of the points fall
+    inside the density and are returned after one multiplication and one comparison. The others
+    are checked against the density, or drawn from the tail beyond ZIGGURAT_R for the base layer.
+
+    Args:
+        mu (float): The mean of the distribution.
+        sigma (float): The standard deviation of the distribution.
+
+    Returns:
+        float: A random number from the normal distribution.
+    """
+    x, f = _ZIGGURAT_X_LIST, _ZIGGURAT_F_LIST
+    while True:
+        layer = int(rnd.random() * ZIGGURAT_LAYERS)
+        u = 2 * rnd.random() - 1
+        z = u * x[layer]
+        if abs(z) < x[layer + 1]:
+            return z * sigma + mu
+        if layer == 0:
+            while True:
+                tail = -math.log(1 - rnd.random()) / ZIGGURAT_R
+                if -2 * math.log(1 - rnd.random()) > tail * tail:
+                    return math.copysign(ZIGGURAT_R + tail, u) * sigma + mu
+        if f[layer] + rnd.random() * (f[layer + 1] - f[layer]) < math.exp(-0.5 * z * z):
+            return z * sigma + mu
+
+
+def poisson_distribution_generator(lamb: float) -> float:
+    """Generates a random number from a Poisson distribution multiplying uniforms until their product drops below e^-lambda.
+
+    Args:
+        lamb (float): The mean number of events (lambda) of the distribution.
+
+    Returns:
+        float: A random number from the Poisson distribution.
+    """
+    limit = math.exp(-lamb)
+    k = 0
+    product = rnd.random()
+    while product > limit:
+        k += 1
+        product *= rnd.random()
+    return float(k)
+
+
+def gamma_distribution_generator(k: float, lamb: float) -> float:
+    """Generates a random number from a gamma distribution using the Marsaglia-Tsang method.
+
+    With an integer shape k this is the Erlang distribution, the sum of k exponentials of rate lamb.
+
+    Args:
+        k (float): The shape parameter of the distribution.
+        lamb (float): The rate parameter (lambda) of the distribution.
+
+    Returns:
+        float: A random number from the gamma distribution.
+    """
+    if k < 1:
+        return gamma_distribution_generator(k + 1, lamb) * (1 - rnd.random()) ** (1 / k)
+
+    d = k - 1 / 3
+    c = 1 / math.sqrt(9 * d)
+    while True:
+        z = normal_distribution_generator_box_muller(0.0, 1.0)
+        v = (1 + c * z) ** 3
+        if v > 0 and math.log(1 - rnd.random()) < 0.5 * z * z + d - d * v + d * math.log(v):
+            return d * v / lamb
+
+
+def triangular_distribution_generator(min: float, mode: float, max: float) -> float:
+    """Generates a random number from a triangular distribution using the inverse transform.
+
+    Args:
+        min (float): The lower bound of the distribution.
+        mode (float): The most likely value of the distribution.
+        max (float): The upper bound of the distribution.
+
+    Returns:
+        float: A random number from the triangular distribution.
+    """
+    u = rnd.random()
+    if u < (mode - min) / (max - min):
+        return min + math.sqrt(u * (max - min) * (mode - min))
+    return max - math.sqrt((1 - u) * (max - min) * (max - mode))
+
+
+def lognormal_distribution_generator(mu: float, sigma: float) -> float:
+    """Generates a random number from a lognormal distribution, the exponential of a normal one.
+
+    Args:
+        mu (float): The mean of the underlying normal distribution.
+        sigma (float): The standard deviation of the underlying normal distribution.
+
+    Returns:
+        float: A random number from the lognormal distribution.
+    """
+    return math.exp(normal_distribution_generator_box_muller(mu, sigma))
+
+def uniform_distribution_batch(n: int, min: float, max: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a uniform distribution in a single vectorized pass.
+
+    Args:
+        n (int): The number of samples to generate.
+        min (float): The lower bound of the distribution.
+        max (float): The upper bound of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the uniform distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    return min + rng.random(n) * (max - min)
+
+
+def negative_exponential_distribution_batch(n: int, lamb: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a negative exponential distribution using the inverse transform.
+
+    Args:
+        n (int): The number of samples to generate.
+        lamb (float): The rate parameter (lambda) of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the negative exponential distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    return -1/lamb * np.log(1 - rng.random(n))
+
+
+def normal_distribution_batch(n: int, mu: float, sigma: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a normal distribution using the convolution method.
+
+    Each sample is the sum of 12 uniforms, so the whole batch is drawn as an (n, 12) matrix.
+
+    Args:
+        n (int): The number of samples to generate.
+        mu (float): The mean of the distribution.
+        sigma (float): The standard deviation of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the normal distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    return (rng.random((n, 12)).sum(axis=1) - 6) * sigma + mu
+
+
+def normal_distribution_batch_box_muller(n: int, mu: float, sigma: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a normal distribution using the Box-Muller method.
+
+    Both variates of every (u1, u2) pair are used, so only ceil(n / 2) pairs are drawn.
+
+    Args:
+        n (int): The number of samples to generate.
+        mu (float): The mean of the distribution.
+        sigma (float): The standard deviation of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the normal distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    pairs = (n + 1) // 2
+    u1 = 1 - rng.random(pairs)
+    u2 = rng.random(pairs)
+    radius = np.sqrt(-2.0 * np.log(u1))
+    angle = 2.0 * np.pi * u2
+    samples = np.empty(2 * pairs)
+    samples[0::2] = radius * np.cos(angle)
+    samples[1::2] = radius * np.sin(angle)
+    return samples[:n] * sigma + mu
+
+
+def normal_distribution_batch_polar(n: int, mu: float, sigma: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a normal distribution using the Marsaglia polar method.
+
+    Points of the square are drawn in arrays and the ones outside the unit circle are dropped with
+    a mask; both variates of every accepted point are used, and only the pairs still missing are
+    drawn again.
+
+    Args:
+        n (int): The number of samples to generate.
+        mu (float): The mean of the distribution.
+        sigma (float): The standard deviation of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the normal distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    samples = np.empty(n)
+    filled = 0
+    while filled < n:
+        pairs = int((n - filled) / 2 / (math.pi / 4) * 1.02) + 8
+        u = 2 * rng.random(pairs) - 1
+        v = 2 * rng.random(pairs) - 1
+        s = u * u + v * v
+        accepted = (s > 0) & (s < 1)
+        u, v, s = u[accepted], v[accepted], s[accepted]
+        factor = np.sqrt(-2 * np.log(s) / s)
+        values = np.stack((u * factor, v * factor), axis=1).ravel()[:n - filled]
+        samples[filled:filled + len(values)] = values
+        filled += len(values)
+    return samples * sigma + mu
+
+
+def _normal_tail_batch(n: int, rng) -> np.ndarray:
+    """n values of the standard normal tail beyond ZIGGURAT_R, minus ZIGGURAT_R (Marsaglia's tail method)."""
+    samples = np.empty(n)
+    filled = 0
+    while filled < n:
+        size = 2 * (n - filled) + 8
+        tail = -np.log(1 - rng.random(size)) / ZIGGURAT_R
+        accepted = -2 * np.log(1 - rng.random(size)) > tail * tail
+        values = tail[accepted][:n - filled]
+        samples[filled:filled + len(values)] = values
+        filled += len(values)
+    return samples
+
+
+def normal_distribution_batch_ziggurat(n: int, mu: float, sigma: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a normal distribution using the ziggurat method.
+
+    The layer and the point of every candidate are drawn in arrays. Most candidates are accepted
+    by comparing with the width of the next layer. The wedge ones are checked against the density
+    and the tail ones drawn by _normal_tail_batch, both only on their subset. Rejected candidates
+    are replaced by drawing again only as many as are still missing.
+
+    Args:
+        n (int): The number of samples to generate.
+        mu (float): The mean of the distribution.
+        sigma (float): The standard deviation of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the normal distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    samples = np.empty(n)
+    filled = 0
+    while filled < n:
+        size = int((n - filled) * 1.02) + 16
+        layer = (rng.random(size) * ZIGGURAT_LAYERS).astype(np.int64)
+        u = 2 * rng.random(size) - 1
+        z = u * ZIGGURAT_X[layer]
+        accepted = np.abs(z) < ZIGGURAT_X[layer + 1]
+
+        slow = np.flatnonzero(~accepted)
+        wedge = slow[layer[slow] > 0]
+        low, high = ZIGGURAT_F[layer[wedge]], ZIGGURAT_F[layer[wedge] + 1]
+        accepted[wedge] = low + rng.random(len(wedge)) * (high - low) < np.exp(-0.5 * z[wedge] ** 2)
+        tail = slow[layer[slow] == 0]
+        z[tail] = np.copysign(ZIGGURAT_R + _normal_tail_batch(len(tail), rng), u[tail])
+        accepted[tail] = True
+
+        values = z[accepted][:n - filled]
+        samples[filled:filled + len(values)] = values
+        filled += len(values)
+    return samples * sigma + mu
+
+
+@lru_cache(maxsize=16)
+def _poisson_table(lamb: float) -> tuple[int, np.ndarray]:
+    """The CDF of a Poisson distribution over lambda +- 12 standard deviations, as (first k, cdf).
+
+    The window holds O(sqrt(lambda)) values, the mass outside it (below 1e-30) is neglected. It is
+    built once per lambda, every chunk of a run and every run with the same lambda reuse it.
+    """
+    spread = 12 * math.sqrt(lamb) + 12
+    start = max(0, int(lamb - spread))
+    k = np.arange(start, int(lamb + spread) + 1)
+    # log p(k) from log p(start) by the ratio p(j) / p(j - 1) = lambda / j.
+    log_pmf = start * math.log(lamb) - lamb - math.lgamma(start + 1) + np.concatenate(
+        ([0.0], np.cumsum(math.log(lamb) - np.log(k[1:])))
+    )
+    cdf = np.cumsum(np.exp(log_pmf))
+    cdf /= cdf[-1]
+    cdf.flags.writeable = False
+    return start, cdf
+
+
+def poisson_distribution_batch(n: int, lamb: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a Poisson distribution by inverting a precomputed table of its CDF.
+
+    The table covers lambda plus and minus 12 standard deviations (see _poisson_table), so a whole
+    batch is one np.searchsorted of n uniforms instead of a loop per sample.
+
+    Args:
+        n (int): The number of samples to generate.
+        lamb (float): The mean number of events (lambda) of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the Poisson distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    start, cdf = _poisson_table(float(lamb))
+    return (start + np.searchsorted(cdf, rng.random(n), side='right')).astype(np.float64)
+
+
+def gamma_distribution_batch(n: int, k: float, lamb: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a gamma (Erlang, for an integer k) distribution using the Marsaglia-Tsang method.
+
+    Candidates are drawn in arrays and filtered with a mask; the rejected ones (a few percent) are
+    replaced by drawing again only as many as are still missing.
+
+    Args:
+        n (int): The number of samples to generate.
+        k (float): The shape parameter of the distribution.
+        lamb (float): The rate parameter (lambda) of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the gamma distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    if k < 1:
+        return gamma_distribution_batch(n, k + 1, lamb, rng) * (1 - rng.random(n)) ** (1 / k)
+
+    d = k - 1 / 3
+    c = 1 / math.sqrt(9 * d)
+    samples = np.empty(n)
+    filled = 0
+    while filled < n:
+        size = int((n - filled) * 1.05) + 16
+        z = normal_distribution_batch_box_muller(size, 0.0, 1.0, rng)
+        u = 1 - rng.random(size)
+        v = (1 + c * z) ** 3
+        with np.errstate(invalid='ignore', divide='ignore'):
+            accepted = (v > 0) & (np.log(u) < 0.5 * z * z + d - d * v + d * np.log(v))
+        values = d * v[accepted][:n - filled]
+        samples[filled:filled + len(values)] = values
+        filled += len(values)
+    return samples / lamb
+
+
+def triangular_distribution_batch(n: int, min: float, mode: float, max: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a triangular distribution using the inverse transform.
+
+    Args:
+        n (int): The number of samples to generate.
+        min (float): The lower bound of the distribution.
+        mode (float): The most likely value of the distribution.
+        max (float): The upper bound of the distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the triangular distribution.
+    """
+    rng = rng if rng is not None else make_rng()
+    u = rng.random(n)
+    lower = u < (mode - min) / (max - min)
+    return np.where(
+        lower, min + np.sqrt(u * (max - min) * (mode - min)), max - np.sqrt((1 - u) * (max - min) * (max - mode))
+    )
+
+
+def lognormal_distribution_batch(n: int, mu: float, sigma: float, rng=None) -> np.ndarray:
+    """Generates n numbers from a lognormal distribution, the exponential of a Box-Muller normal batch.
+
+    Args:
+        n (int): The number of samples to generate.
+        mu (float): The mean of the underlying normal distribution.
+        sigma (float): The standard deviation of the underlying normal distribution.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+
+    Returns:
+        np.ndarray: An array of n samples from the lognormal distribution.
+    """
+    return np.exp(normal_distribution_batch_box_muller(n, mu, sigma, rng))
+
+
+BATCH_GENERATORS = {
+    uniform_distribution_generator: uniform_distribution_batch,
+    negative_exponential_distribution_generator: negative_exponential_distribution_batch,
+    normal_distribution_generator: normal_distribution_batch,
+    normal_distribution_generator_box_muller: normal_distribution_batch_box_muller,
+    normal_distribution_generator_polar: normal_distribution_batch_polar,
+    normal_distribution_generator_ziggurat: normal_distribution_batch_ziggurat,
+    poisson_distribution_generator: poisson_distribution_batch,
+    gamma_distribution_generator: gamma_distribution_batch,
+    triangular_distribution_generator: triangular_distribution_batch,
+    lognormal_distribution_generator: lognormal_distribution_batch,
+}
+
+
+def generate_random_variable_distribution_scalar(n: int, callback, ndigits: int = -1, **kwargs) -> np.ndarray:
+    """Generates a random variable distribution calling the scalar generator once per sample.
+
+    This is the reference implementation the batch path is checked against.
 
     Args:
         n (int): The number of samples to generate.
@@ -68,21 +506,85 @@ def generate_random_variable_distribution(n: int, callback, ndigits: int = -1, *
     return np.array([callback(**kwargs) for _ in range(n)]) if ndigits == -1 else np.array([round(callback(**kwargs), ndigits) for _ in range(n)])
 
 
+def generate_random_variable_distribution(n: int, callback, ndigits: int = -1, rng=None, **kwargs) -> np.ndarray:
+    """Generates a random variable distribution.
+
+    Known scalar generators are dispatched to their batch counterpart in BATCH_GENERATORS, any
+    other callback falls back to the scalar path.
+
+    Args:
+        n (int): The number of samples to generate.
+        callback (function): The function used to generate each sample.
+        ndigits (int, optional): The number of decimal places to round the samples. Defaults to -1.
+        rng (optional): The generator the batch path draws from (see rng.make_rng). Defaults to None,
+            which uses a freshly seeded stream. The scalar path always uses the random module.
+
+    Returns:
+        np.ndarray: An array of generated samples.
+    """
+    batch = BATCH_GENERATORS.get(callback)
+    if batch is None:
+        return generate_random_variable_distribution_scalar(n, callback, ndigits, **kwargs)
+
+    samples = batch(n, rng=rng, **kwargs)
+    return samples if ndigits == -1 else np.round(samples, ndigits)
+
+
+def compare_generation_paths(n: int, callback, seed: int | None = None, alpha: float = 0.05, **kwargs) -> dict:
+    """Compares the scalar and batch paths of a generator on two independent samples.
+
+    benchmark.py --validate runs it for every generator case and fails when the paths diverge.
+
+    Args:
+        n (int): The number of samples to draw on each path.
+        callback (function): The scalar generator, it must have an entry in BATCH_GENERATORS.
+        seed (int | None, optional): Seeds both paths, for a reproducible check. Defaults to None.
+        alpha (float, optional): The significance level of the critical value. Defaults to 0.05.
+
+    Returns:
+        dict: The mean and variance of each path, the two-sample Kolmogorov-Smirnov statistic, its
+            critical value at alpha and whether the statistic stays below it.
+    """
+    if seed is not None:
+        rnd.seed(seed)
+    scalar = np.sort(generate_random_variable_distribution_scalar(n, callback, **kwargs))
+    batch = np.sort(BATCH_GENERATORS[callback](n, rng=make_rng(seed), **kwargs))
+
+    grid = np.concatenate((scalar, batch))
+    scalar_cdf = np.searchsorted(scalar, grid, side='right') / n
+    batch_cdf = np.searchsorted(batch, grid, side='right') / n
+
+    statistic = float(np.max(np.abs(scalar_cdf - batch_cdf)))
+    critical = math.sqrt(-math.log(alpha / 2) / 2) * math.sqrt(2 / n)
+    return {
+        'scalar_mean': float(scalar.mean()),
+        'batch_mean': float(batch.mean()),
+        'scalar_var': float(scalar.var()),
+        'batch_var': float(batch.var()),
+        'ks_statistic': statistic,
+        'ks_critical': critical,
+        'passed': statistic <= critical,
+    }
+
+
 def generate_random_normal_variable_box_muller(n: int, mu: float, sigma: float, ndigits: int = -1) -> np.ndarray:
-    return np.array([normal_distribution_generator_box_muller(mu, sigma) for _ in range(n)]) if ndigits == -1 else np.array([round(normal_distribution_generator_box_muller(mu, sigma), ndigits) for _ in range(n)])
+    return generate_random_variable_distribution(n, normal_distribution_generator_box_muller, ndigits, mu=mu, sigma=sigma)
 
 
 def show_graph(uniform, normal_distribution, exponential_distribution, uniform_intervals: int = 5, exponential_intervals: int = 5, normal_intervals: int = 5):
-    plt.figure(figsize=(15, 10))
-    plt.subplot(3, 1, 1)
-    plt.hist(uniform, bins=uniform_intervals, alpha=0.7, label='Uniform')
-    plt.legend()
-    plt.subplot(3, 1, 2)
-    plt.hist(normal_distribution, bins=normal_intervals, alpha=0.7, label='Normal')
-    plt.legend()
-    plt.subplot(3, 1, 3)
-    plt.hist(exponential_distribution, bins=exponential_intervals, alpha=0.7, label='Exponential')
-    plt.legend()
+    import matplotlib.pyplot as plt
+
+    from binning import Binning
+    from plots import draw_histogram
+
+    samples = [
+        (uniform, uniform_intervals, 'Uniform'),
+        (normal_distribution, normal_intervals, 'Normal'),
+        (exponential_distribution, exponential_intervals, 'Exponential'),
+    ]
+    _, axes = plt.subplots(len(samples), 1, figsize=(15, 10))
+    for ax, (values, intervals, label) in zip(axes, samples):
+        draw_histogram(ax, *Binning(values).histogram(intervals), label=label)
     plt.show()
 
 
@@ -0,0 +1,248 @@
+"""Per-stage timing, memory and profiling of the generation pipeline.
+
+A Run collects the stages of one click (generation in the worker, then the table, the frequency
+table and the chart in the GUI thread). When it finishes it is written as one JSON log line and
+handed to the listeners, e.g. the status bar of the main window.
+
+Disabled (the default), start_run returns NULL_RUN and every stage is a shared no-op context
+manager, so the pipeline pays one method call per stage. It is enabled with the --instrument flag
+of app.py or these environment variables:
+    TP2_INSTRUMENT=1         time every stage and log the runs to stderr
+    TP2_TRACE_MEMORY=1       also record the traced memory peak of every stage (tracemalloc)
+    TP2_PROFILE_DIR=<dir>    also capture a cProfile .prof file per run in <dir>
+    TP2_LOG=<file>           write the JSON lines to <file> instead of stderr
+"""
+import cProfile
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+STAGE_LABELS = {
+    'cache': 'caché',
+    'open': 'apertura',
+    'generate': 'generación',
+    'histogram': 'histograma',
+    'ks': 'K-S',
+    'moments': 'momentos',
+    'replicate': 'réplicas',
+    'summary': 'resumen',
+    'tests': 'pruebas',
+    'table_model': 'modelo de tabla',
+    'resize_columns': 'ajuste de columnas',
+    'frequency_table': 'tabla de frecuencias',
+    'plot': 'gráfico',
+    'draw': 'dibujo',
+}
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _NullRun:
+    """Stands in for a Run when instrumentation is disabled."""
+
+    def stage(self, name: str):
+        return NULL_STAGE
+
+    @contextmanager
+    def active(self):
+        yield self
+
+    def hold(self):
+        pass
+
+    def release(self):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_RUN = _NullRun()
+
+
+class _Stage:
+    def __init__(self, run: 'Run', name: str):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        if self.run.instrumentation.trace_memory:
+            self.memory_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        if self.run.profiler is not None:
+            try:
+                self.run.profiler.enable()
+                self.profiling = True
+            except ValueError:
+                # Another profiler is already active (e.g. a stage of the same run in another thread).
+                self.profiling = False
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if self.run.profiler is not None and self.profiling:
+            self.run.profiler.disable()
+        peak = None
+        if self.run.instrumentation.trace_memory:
+            peak = max(tracemalloc.get_traced_memory()[1] - self.memory_before, 0)
+        self.run.add(self.name, seconds, peak)
+        return False
+
+
+class Run:
+    """The stages of one run. Stages may be timed from several threads, one after the other.
+
+    Memory peaks come from a single process-wide tracemalloc peak, so a stage that overlaps another
+    one in a different thread reports the larger of the two.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, instrumentation: 'Instrumentation', label: str, **details):
+        self.instrumentation = instrumentation
+        self.id = next(self._ids)
+        self.label = label
+        self.details = details
+        self.stages = []
+        self.finished = False
+        self.finish_requested = False
+        self.holds = 0
+        self.start = time.perf_counter()
+        self.profiler = cProfile.Profile() if instrumentation.profile_dir else None
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def add(self, name: str, seconds: float, peak_bytes: int | None = None):
+        with self._lock:
+            if not self.finished:
+                self.stages.append({'name': name, 'seconds': seconds, 'peak_bytes': peak_bytes})
+
+    @contextmanager
+    def active(self):
+        """Makes this the run that Instrumentation.stage records into, in the GUI thread."""
+        previous = self.instrumentation.current
+        self.instrumentation.current = self
+        try:
+            yield self
+        finally:
+            self.instrumentation.current = previous
+
+    def hold(self):
+        """Delays finish until release, e.g. while a chart draw of this run is pending."""
+        with self._lock:
+            self.holds += 1
+
+    def release(self):
+        with self._lock:
+            self.holds -= 1
+            requested = self.holds == 0 and self.finish_requested
+        if requested:
+            self.finish()
+
+    def finish(self):
+        with self._lock:
+            if self.finished:
+                return
+            if self.holds:
+                self.finish_requested = True
+                return
+            self.finished = True
+
+        report = {
+            'event': 'run',
+            'id': self.id,
+            'label': self.label,
+            **self.details,
+            'total_seconds': time.perf_counter() - self.start,
+            'stages': self.stages,
+        }
+        if self.profiler is not None:
+            os.makedirs(self.instrumentation.profile_dir, exist_ok=True)  # type: ignore
+            path = os.path.join(self.instrumentation.profile_dir, f'run-{self.id}-{self.label}.prof')  # type: ignore
+            self.profiler.dump_stats(path)
+            report['profile'] = path
+        self.instrumentation.publish(report)
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, profile_dir: str | None = None,
+                 log_path: str | None = None):
+        self.enabled = False
+        self.trace_memory = False
+        self.profile_dir = None
+        self.current = None
+        self.listeners = []
+        self.logger = logging.getLogger('tp2.instrumentation')
+        self.logger.propagate = False
+        self.configure(enabled, trace_memory, profile_dir, log_path)
+
+    @classmethod
+    def from_env(cls) -> 'Instrumentation':
+        return cls(
+            enabled=os.environ.get('TP2_INSTRUMENT', '') not in ('', '0'),
+            trace_memory=os.environ.get('TP2_TRACE_MEMORY', '') not in ('', '0'),
+            profile_dir=os.environ.get('TP2_PROFILE_DIR') or None,
+            log_path=os.environ.get('TP2_LOG') or None,
+        )
+
+    def configure(self, enabled: bool = True, trace_memory: bool = False, profile_dir: str | None = None,
+                  log_path: str | None = None):
+        """Turns instrumentation on or off; memory tracing and profiling also turn it on."""
+        self.enabled = enabled or trace_memory or profile_dir is not None
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        if self.enabled:
+            handler = logging.FileHandler(log_path, encoding='utf-8') if log_path else logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.logger.addHandler(handler)
+            self.logger.setLevel(logging.INFO)
+
+    def start_run(self, label: str, **details) -> Run | _NullRun:
+        return Run(self, label, **details) if self.enabled else NULL_RUN
+
+    def stage(self, name: str):
+        """A stage of the active run (see Run.active), or a no-op when there is none."""
+        return self.current.stage(name) if self.current is not None else NULL_STAGE
+
+    def publish(self, report: dict):
+        self.logger.info(json.dumps(report))
+        for listener in self.listeners:
+            listener(report)
+
+
+def format_report(report: dict) -> str:
+    """One-line summary of a run for the status bar."""
+    parts = []
+    for stage in report['stages']:
+        text = f'{STAGE_LABELS.get(stage["name"], stage["name"])} {stage["seconds"] * 1000:.0f} ms'
+        if stage['peak_bytes'] is not None:
+            text += f' ({stage["peak_bytes"] / 2**20:.1f} MiB)'
+        parts.append(text)
+    parts.append(f'total {report["total_seconds"] * 1000:.0f} ms')
+    return ' · '.join(parts)
+
+
+INSTRUMENTATION = Instrumentation.from_env()
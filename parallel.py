@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from generators import generate_random_variable_distribution
+from rng import make_rng, new_seed
+from storage import STORAGE_DTYPES, encode
+
+
+GENERATION_CHUNK_SIZE = 100_000
+PARALLEL_MIN_CHUNK_SIZE = 250_000
+
+
+class GenerationCancelled(Exception):
+    pass
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def split_sizes(n: int, chunks: int) -> list[int]:
+    """Splits n into `chunks` sizes that differ by at most one."""
+    base, extra = divmod(n, chunks)
+    return [base + 1 if i < extra else base for i in range(chunks)]
+
+
+def _generate_chunk(size: int, callback, ndigits: int, seed_sequence, kind: str, storage: str, kwargs: dict) -> np.ndarray:
+    values = generate_random_variable_distribution(size, callback, ndigits, rng=make_rng(seed_sequence, kind), **kwargs)
+    return encode(values, storage, ndigits)
+
+
+def generate_random_variable_distribution_chunked(n: int, callback, ndigits: int = -1, rng=None,
+                                                  chunk_size: int = GENERATION_CHUNK_SIZE, progress=None, cancelled=None,
+                                                  storage: str = 'float64', **kwargs) -> np.ndarray:
+    """Generates a random variable distribution in chunks drawn one after the other from the same stream.
+
+    Args:
+        n (int): The number of samples to generate.
+        callback (function): The scalar generator of the distribution (see BATCH_GENERATORS).
+        ndigits (int, optional): The number of decimal places to round the samples. Defaults to -1.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+        chunk_size (int, optional): The number of samples per chunk. Defaults to GENERATION_CHUNK_SIZE.
+        progress (function, optional): Called as progress(done, n) after every chunk. Defaults to None.
+        cancelled (function, optional): Checked before every chunk, GenerationCancelled is raised when
+            it returns True. Defaults to None.
+        storage (str, optional): One of storage.STORAGE_FORMATS; every chunk is encoded as soon as it is
+            generated, so no full float64 copy is ever held. Defaults to 'float64'.
+
+    Returns:
+        np.ndarray: An array of generated samples in the storage format.
+    """
+    rng = rng if rng is not None else make_rng()
+    out = np.empty(n, dtype=STORAGE_DTYPES[storage])
+
+    for start in range(0, n, chunk_size):
+        if cancelled is not None and cancelled():
+            raise GenerationCancelled()
+
+        stop = min(n, start + chunk_size)
+        out[start:stop] = encode(generate_random_variable_distribution(stop - start, callback, ndigits, rng=rng, **kwargs), storage, ndigits)
+
+        if progress is not None:
+            progress(stop, n)
+
+    return out
+
+
+def generate_random_variable_distribution_parallel(n: int, callback, ndigits: int = -1, seed: int | None = None,
+                                                   kind: str = 'numpy', workers: int | None = None, progress=None,
+                                                   cancelled=None, storage: str = 'float64', **kwargs) -> np.ndarray:
+    """Generates a random variable distribution splitting the work across a process pool.
+
+    n is split into one chunk per worker and every chunk draws from its own stream, spawned from
+    the seed with SeedSequence.spawn, so the result only depends on (seed, kind, workers) and not
+    on the order in which the processes finish. When the chunks would be too small to pay for the
+    pool start-up they are generated in this process with the same streams, which gives the same
+    output.
+
+    Args:
+        n (int): The number of samples to generate.
+        callback (function): The scalar generator of the distribution (see BATCH_GENERATORS).
+        ndigits (int, optional): The number of decimal places to round the samples. Defaults to -1.
+        seed (int | None, optional): The root seed. Defaults to None, which draws a fresh seed.
+        kind (str, optional): The generator kind passed to rng.make_rng. Defaults to 'numpy'.
+        workers (int | None, optional): The number of chunks and processes. Defaults to the CPU count.
+        progress (function, optional): Called as progress(done, n) after every chunk. Defaults to None.
+        cancelled (function, optional): Checked between chunks, pending chunks are dropped and
+            GenerationCancelled is raised when it returns True. Defaults to None.
+        storage (str, optional): One of storage.STORAGE_FORMATS, the workers encode their chunk before
+            sending it back. Defaults to 'float64'.
+
+    Returns:
+        np.ndarray: An array of generated samples in the storage format.
+    """
+    workers = workers or default_workers()
+    seed = seed if seed is not None else new_seed()
+
+    sizes = split_sizes(n, workers)
+    offsets = np.concatenate(([0], np.cumsum(sizes)))
+    seed_sequences = np.random.SeedSequence(seed).spawn(workers)
+    out = np.empty(n, dtype=STORAGE_DTYPES[storage])
+
+    if workers == 1 or n < PARALLEL_MIN_CHUNK_SIZE * 2:
+        for i, size in enumerate(sizes):
+            if cancelled is not None and cancelled():
+                raise GenerationCancelled()
+            out[offsets[i]:offsets[i + 1]] = _generate_chunk(size, callback, ndigits, seed_sequences[i], kind, storage, kwargs)
+            if progress is not None:
+                progress(int(offsets[i + 1]), n)
+        return out
+
+    # Spawned rather than forked children, the parent may be running Qt threads.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {
+            executor.submit(_generate_chunk, size, callback, ndigits, seed_sequences[i], kind, storage, kwargs): i
+            for i, size in enumerate(sizes)
+        }
+        done = 0
+        for future in as_completed(futures):
+            if cancelled is not None and cancelled():
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise GenerationCancelled()
+
+            i = futures[future]
+            out[offsets[i]:offsets[i + 1]] = future.result()
+            done += sizes[i]
+            if progress is not None:
+                progress(done, n)
+
+    return out
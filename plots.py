@@ -0,0 +1,167 @@
+"""Histograms, density overlays and Q-Q/P-P plots drawn on matplotlib axes.
+
+The window and generators.show_graph draw through these functions. The comparison plots never
+read a raw sample: summarize reduces every sample once to a density over COMPARISON_BINS
+intervals and QUANTILE_POINTS order statistics, with the matching theoretical curves. Overlaying
+several samples of 10^6 values then draws a few hundred points each.
+
+Only NumPy is imported here; the functions receive the axes to draw on.
+"""
+import numpy as np
+
+
+COMPARISON_BINS = 100
+QUANTILE_POINTS = 500
+CURVE_POINTS = 200
+
+
+class SampleSummary:
+    """The reduced arrays a sample is compared with.
+
+    Args:
+        label (str): The name of the sample in the legends.
+        n (int): The size of the sample.
+        bin_edges (np.ndarray): The edges of the density intervals.
+        density (np.ndarray): The frequency of every interval divided by n and its width.
+        probabilities (np.ndarray): The empirical probabilities (i + 0.5) / n of the order statistics kept.
+        sample_quantiles (np.ndarray): Those order statistics.
+        curve (tuple | None): (x, pdf(x)) of the theoretical distribution, or None when unknown.
+        theoretical_quantiles (np.ndarray | None): The theoretical quantiles at `probabilities`.
+        theoretical_probabilities (np.ndarray | None): The theoretical cdf at `sample_quantiles`.
+        discrete (bool): Whether the curve is a probability mass, drawn as points.
+    """
+
+    def __init__(self, label: str, n: int, bin_edges: np.ndarray, density: np.ndarray, probabilities: np.ndarray,
+                 sample_quantiles: np.ndarray, curve=None, theoretical_quantiles=None, theoretical_probabilities=None,
+                 discrete: bool = False):
+        self.label = label
+        self.n = n
+        self.bin_edges = bin_edges
+        self.density = density
+        self.probabilities = probabilities
+        self.sample_quantiles = sample_quantiles
+        self.curve = curve
+        self.theoretical_quantiles = theoretical_quantiles
+        self.theoretical_probabilities = theoretical_probabilities
+        self.discrete = discrete
+
+
+def summarize(label: str, sorted_values: np.ndarray, distribution=None, params: dict | None = None,
+              bins: int = COMPARISON_BINS, points: int = QUANTILE_POINTS) -> SampleSummary:
+    """Reduces a sorted sample to what the comparison plots draw.
+
+    Args:
+        label (str): The name of the sample in the legends.
+        sorted_values (np.ndarray): The sample in ascending order, e.g. Binning.sorted_values().
+        distribution (Distribution, optional): The distribution to draw and test against. Defaults to None.
+        params (dict, optional): Its parameters. Defaults to None.
+        bins (int, optional): The number of density intervals. Defaults to COMPARISON_BINS.
+        points (int, optional): The number of order statistics kept for Q-Q and P-P. Defaults to QUANTILE_POINTS.
+
+    Returns:
+        SampleSummary: The density, order statistics and theoretical curves.
+    """
+    params = params or {}
+    n = len(sorted_values)
+    low, high = float(sorted_values[0]), float(sorted_values[-1])
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+
+    if distribution is not None and distribution.discrete and high - low < bins:
+        # One interval centered on every integer, so the density estimates the probability mass.
+        bin_edges = np.arange(np.floor(low) - 0.5, np.ceil(high) + 1.0)
+    else:
+        bin_edges = np.linspace(low, high, bins + 1)
+    # The values are sorted, so the counts come from the positions of the edges, as in Binning.
+    starts = np.searchsorted(sorted_values, bin_edges[:-1], side='left')
+    counts = np.diff(np.append(starts, n))
+    density = counts / (n * np.diff(bin_edges))
+
+    positions = np.unique(np.round(np.linspace(0, n - 1, min(points, n))).astype(np.int64))
+    probabilities = (positions + 0.5) / n
+    sample_quantiles = np.asarray(sorted_values[positions], dtype=np.float64)
+
+    summary = SampleSummary(label, n, bin_edges, density, probabilities, sample_quantiles)
+    if distribution is None:
+        return summary
+
+    summary.discrete = distribution.discrete
+    if distribution.discrete:
+        x = np.arange(np.ceil(low), np.floor(high) + 1)
+        # The cdf is P(X < x), the middle of its jump at an integer k is the mid-probability of k.
+        summary.theoretical_probabilities = (distribution.cdf(sample_quantiles, **params)
+                                             + distribution.cdf(sample_quantiles + 1, **params)) / 2
+    else:
+        x = np.linspace(low, high, CURVE_POINTS)
+        summary.theoretical_probabilities = distribution.cdf(sample_quantiles, **params)
+    summary.curve = (x, distribution.pdf(x, **params))
+    summary.theoretical_quantiles = distribution.quantiles(probabilities, **params)
+    return summary
+
+
+def draw_histogram(ax, counts: np.ndarray, bin_edges: np.ndarray, label: str | None = None, interval_legend_max: int = 0,
+                   alpha: float = 0.7):
+    """Draws precomputed counts as bars and returns their container.
+
+    With interval_legend_max, a histogram of up to that many intervals gets a legend with the
+    bounds of every interval; otherwise the bars take `label`.
+    """
+    bars = ax.bar(bin_edges[:-1], counts, width=np.diff(bin_edges), align='edge', alpha=alpha, label=label)
+
+    legend = ax.get_legend()
+    if legend is not None:
+        legend.remove()
+
+    if len(counts) <= interval_legend_max:
+        labels = [f"[{bin_edges[i]:.2f}, {bin_edges[i+1]:.2f})" for i in range(len(bin_edges)-1)]
+        for patch, interval in zip(bars, labels):  # type: ignore
+            patch.set_label(interval)
+        ax.legend(fontsize=8, title="Intervalos")
+    elif label is not None:
+        ax.legend()
+    return bars
+
+
+def draw_densities(ax, summaries: list[SampleSummary], theoretical: bool = True):
+    """Overlays the density of every sample, each with its theoretical curve dashed in the same color."""
+    for summary in summaries:
+        line = ax.stairs(summary.density, summary.bin_edges, label=summary.label, linewidth=1.5)
+        if theoretical and summary.curve is not None:
+            x, y = summary.curve
+            style = 'o' if summary.discrete else '--'
+            ax.plot(x, y, style, color=line.get_edgecolor(), markersize=3, linewidth=1)
+    ax.set_xlabel('Valor')
+    ax.set_ylabel('Densidad')
+    ax.set_title('Densidades (trazo discontinuo: teórica)' if theoretical else 'Densidades')
+
+
+def draw_qq(ax, summaries: list[SampleSummary], theoretical: bool = True):
+    """Sample quantiles against the theoretical ones; the points of a sample that fits lie on the diagonal."""
+    drawn = [summary for summary in summaries if summary.theoretical_quantiles is not None]
+    for summary in drawn:
+        ax.plot(summary.theoretical_quantiles, summary.sample_quantiles, '.', markersize=3, label=summary.label)
+    if drawn:
+        low = min(min(s.theoretical_quantiles.min(), s.sample_quantiles.min()) for s in drawn)  # type: ignore
+        high = max(max(s.theoretical_quantiles.max(), s.sample_quantiles.max()) for s in drawn)  # type: ignore
+        ax.plot([low, high], [low, high], color='gray', linewidth=1)
+    ax.set_xlabel('Cuantil teórico')
+    ax.set_ylabel('Cuantil de la muestra')
+    ax.set_title('Gráfico Q–Q')
+
+
+def draw_pp(ax, summaries: list[SampleSummary], theoretical: bool = True):
+    """Empirical probabilities against the theoretical cdf at the same order statistics."""
+    for summary in summaries:
+        if summary.theoretical_probabilities is not None:
+            ax.plot(summary.theoretical_probabilities, summary.probabilities, '.', markersize=3, label=summary.label)
+    ax.plot([0, 1], [0, 1], color='gray', linewidth=1)
+    ax.set_xlabel('Probabilidad teórica')
+    ax.set_ylabel('Probabilidad empírica')
+    ax.set_title('Gráfico P–P')
+
+
+PLOT_KINDS = {
+    'density': ('Densidades', draw_densities),
+    'qq': ('Q–Q', draw_qq),
+    'pp': ('P–P', draw_pp),
+}
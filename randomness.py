@@ -0,0 +1,118 @@
+"""Statistical tests of the U(0, 1) stream the generators draw from.
+
+Every test is a handful of NumPy reductions over the whole stream (bincount, diff, sort along
+rows), so a stream of 10^7 values is assessed in a few seconds. Chi-square tests merge the
+classes that expect fewer than 5 values, as in the goodness-of-fit test of the samples.
+"""
+import math
+import random
+
+import numpy as np
+
+from fit import chi_square_sf, merge_bins
+from rng import RNG_KINDS, make_rng, new_seed
+
+
+# The scalar generators (e.g. uniform_distribution_generator) draw from the random module.
+RANDOMNESS_SOURCES = {**RNG_KINDS, 'python': 'Módulo random de Python (generadores escalares)'}
+
+
+def uniform_stream(n: int, seed: int | None = None, kind: str = 'numpy') -> np.ndarray:
+    """Draws n U(0, 1) values from one of RANDOMNESS_SOURCES."""
+    if kind == 'python':
+        draw = random.Random(seed).random
+        return np.array([draw() for _ in range(n)])
+    return make_rng(seed, kind).random(n)
+
+
+def _chi_square(name: str, label: str, observed: np.ndarray, expected: np.ndarray) -> dict:
+    observed, expected, _ = merge_bins(np.asarray(observed, dtype=np.float64), expected)
+    statistic = float(np.sum((observed - expected) ** 2 / expected))
+    dof = len(expected) - 1
+    return {'test': name, 'label': label, 'statistic': statistic, 'dof': dof, 'p_value': chi_square_sf(statistic, dof)}
+
+
+def _normal(name: str, label: str, z: float) -> dict:
+    return {'test': name, 'label': label, 'statistic': z, 'dof': None, 'p_value': math.erfc(abs(z) / math.sqrt(2))}
+
+
+def frequency_test(u: np.ndarray, classes: int = 10) -> dict:
+    """Chi-square test that the values fall evenly in `classes` equal subintervals of [0, 1)."""
+    observed = np.bincount(np.minimum((u * classes).astype(np.int64), classes - 1), minlength=classes)
+    return _chi_square('frequency', 'Frecuencia', observed, np.full(classes, len(u) / classes))
+
+
+def runs_test(u: np.ndarray) -> dict:
+    """Runs up and down: the number of monotone runs, normal with mean (2n - 1) / 3 and variance (16n - 29) / 90."""
+    n = len(u)
+    ups = np.diff(u) > 0
+    runs = 1 + int(np.count_nonzero(ups[1:] != ups[:-1]))
+    z = (runs - (2 * n - 1) / 3) / math.sqrt((16 * n - 29) / 90)
+    return _normal('runs', 'Corridas arriba y abajo', z)
+
+
+def serial_test(u: np.ndarray, classes: int = 10) -> dict:
+    """Chi-square test of non-overlapping pairs (u[2i], u[2i+1]) over a classes x classes grid."""
+    cells = np.minimum((u[:len(u) // 2 * 2] * classes).astype(np.int64), classes - 1).reshape(-1, 2)
+    observed = np.bincount(cells[:, 0] * classes + cells[:, 1], minlength=classes ** 2)
+    return _chi_square('serial', 'Serial de pares', observed, np.full(classes ** 2, len(cells) / classes ** 2))
+
+
+def gap_test(u: np.ndarray, alpha: float = 0.0, beta: float = 0.5, longest: int = 10) -> dict:
+    """Chi-square test of the gaps between values falling in [alpha, beta).
+
+    A gap of length r has probability p (1 - p)^r with p = beta - alpha; gaps of `longest` or more
+    are counted together.
+    """
+    p = beta - alpha
+    hits = np.flatnonzero((u >= alpha) & (u < beta))
+    gaps = np.minimum(np.diff(hits) - 1, longest)
+    observed = np.bincount(gaps, minlength=longest + 1)
+    probabilities = p * (1 - p) ** np.arange(longest + 1)
+    probabilities[-1] = (1 - p) ** longest
+    return _chi_square('gap', 'Huecos', observed, probabilities * len(gaps))
+
+
+def _stirling2(k: int, r: int) -> int:
+    """Stirling number of the second kind: the ways of splitting k items into r non-empty groups."""
+    return sum((-1) ** j * math.comb(r, j) * (r - j) ** k for j in range(r + 1)) // math.factorial(r)
+
+
+def poker_test(u: np.ndarray, hand: int = 5, digits: int = 10) -> dict:
+    """Chi-square test of how many different digits appear in hands of `hand` consecutive values (Knuth's simplified poker test)."""
+    cards = np.minimum((u[:len(u) // hand * hand] * digits).astype(np.int64), digits - 1).reshape(-1, hand)
+    cards.sort(axis=1)
+    distinct = 1 + np.count_nonzero(np.diff(cards, axis=1), axis=1)
+    observed = np.bincount(distinct, minlength=hand + 1)[1:]
+    probabilities = np.array([
+        math.perm(digits, r) * _stirling2(hand, r) / digits ** hand for r in range(1, hand + 1)
+    ])
+    return _chi_square('poker', 'Póker', observed, probabilities * len(cards))
+
+
+def autocorrelation_test(u: np.ndarray, lag: int = 1) -> dict:
+    """Lag-k autocorrelation: sqrt(n - k) times the sample correlation is asymptotically N(0, 1)."""
+    centered = u - 0.5
+    count = len(u) - lag
+    correlation = float(np.dot(centered[:-lag], centered[lag:])) / count * 12
+    return _normal(f'autocorrelation_{lag}', f'Autocorrelación (retardo {lag})', correlation * math.sqrt(count))
+
+
+def run_battery(u: np.ndarray, alpha: float = 0.05, lags: tuple[int, ...] = (1, 2, 3, 4, 5)) -> list[dict]:
+    """Runs every test on the stream.
+
+    Returns:
+        list[dict]: One result per test with its name, label, statistic, degrees of freedom (None for
+            the normal tests), p-value and whether it passed at significance alpha.
+    """
+    results = [frequency_test(u), runs_test(u), serial_test(u), gap_test(u), poker_test(u)]
+    results += [autocorrelation_test(u, lag) for lag in lags]
+    for result in results:
+        result['passed'] = bool(result['p_value'] >= alpha)
+    return results
+
+
+def assess(n: int, seed: int | None = None, kind: str = 'numpy', alpha: float = 0.05) -> dict:
+    """Draws a stream and runs the battery on it; the seed is drawn and reported when not given."""
+    seed = seed if seed is not None else new_seed()
+    return {'n': n, 'seed': seed, 'rng': kind, 'alpha': alpha, 'tests': run_battery(uniform_stream(n, seed, kind), alpha)}
@@ -0,0 +1,206 @@
+"""Monte Carlo replications: R independent samples of one distribution, summarized together.
+
+Every replication keeps only its counts over STREAM_FINE_BINS fixed bins and its sample moments,
+so the per-interval means, confidence intervals and chi-square rejection rate can be recomputed
+for any number of intervals without generating again, as with a streamed run.
+"""
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+
+import numpy as np
+
+from distributions import for_callback
+from fit import chi_square_sf, expected_frequencies, merge_bins
+from generators import generate_random_variable_distribution
+from parallel import PARALLEL_MIN_CHUNK_SIZE, GenerationCancelled, default_workers
+from rng import make_rng, new_seed
+from streaming import STREAM_FINE_BINS, StreamingHistogram
+
+
+def t_quantile(p: float, dof: int) -> float:
+    """Quantile of Student's t distribution (Abramowitz and Stegun 26.7.5, a series in 1 / dof around the normal quantile)."""
+    z = NormalDist().inv_cdf(p)
+    if dof <= 0:
+        return math.nan
+    return (z + (z ** 3 + z) / (4 * dof) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * dof ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * dof ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * dof ** 4))
+
+
+def mean_interval(values: np.ndarray, confidence: float, axis: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The mean of the replications and its t confidence interval, along `axis`."""
+    count = values.shape[axis]
+    mean = values.mean(axis=axis)
+    half = t_quantile((1 + confidence) / 2, count - 1) * values.std(axis=axis, ddof=1) / math.sqrt(count)
+    return mean, mean - half, mean + half
+
+
+def _replicate(seed_sequences: list, n: int, callback, ndigits: int, kind: str, low: float, high: float,
+               kwargs: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    counts = np.empty((len(seed_sequences), STREAM_FINE_BINS), dtype=np.int64)
+    means = np.empty(len(seed_sequences))
+    variances = np.empty(len(seed_sequences))
+    for i, seed_sequence in enumerate(seed_sequences):
+        values = generate_random_variable_distribution(n, callback, ndigits, rng=make_rng(seed_sequence, kind), **kwargs)
+        histogram = StreamingHistogram(low, high)
+        histogram.update(values)
+        counts[i] = histogram.counts
+        means[i] = values.mean()
+        variances[i] = values.var(ddof=1) if n > 1 else 0.0
+    return counts, means, variances
+
+
+class ReplicationResult:
+    """The fine counts and moments of every replication, with summaries per number of intervals.
+
+    histogram(bins) returns the mean frequency of every interval with the same (counts, bin_edges)
+    shape as Binning and StreamingHistogram, so the chart can show it like any other result.
+    """
+
+    def __init__(self, n: int, callback, kwargs: dict, bin_edges: np.ndarray, counts: np.ndarray, means: np.ndarray,
+                 variances: np.ndarray, alpha: float = 0.05, confidence: float = 0.95, ndigits: int = -1):
+        self.n = n
+        self.callback = callback
+        self.kwargs = kwargs
+        self.bin_edges = bin_edges
+        self.counts = counts
+        self.means = means
+        self.variances = variances
+        self.alpha = alpha
+        self.confidence = confidence
+        self.ndigits = ndigits
+        self._summaries = {}
+
+    @property
+    def replications(self) -> int:
+        return len(self.counts)
+
+    def _regroup(self, bins: int) -> tuple[np.ndarray, np.ndarray]:
+        """Every replication's counts over `bins` intervals, regrouped as in StreamingHistogram.histogram."""
+        bins = min(bins, STREAM_FINE_BINS)
+        boundaries = np.round(np.linspace(0, STREAM_FINE_BINS, bins + 1)).astype(np.int64)
+        return np.add.reduceat(self.counts, boundaries[:-1], axis=1), self.bin_edges[boundaries]
+
+    def histogram(self, bins: int) -> tuple[np.ndarray, np.ndarray]:
+        summary = self.summary(bins)
+        return summary['mean'], summary['bin_edges']
+
+    def summary(self, bins: int) -> dict:
+        """Per-interval mean frequency with its confidence interval and the chi-square rejection rate at `bins` intervals.
+
+        The chi-square test of every replication merges the same intervals, since the expected
+        frequencies do not depend on the sample, so all the statistics come from one matrix product.
+        """
+        if bins in self._summaries:
+            return self._summaries[bins]
+
+        counts, bin_edges = self._regroup(bins)
+        mean, low, high = mean_interval(counts.astype(np.float64), self.confidence)
+        summary = {'bin_edges': bin_edges, 'mean': mean, 'low': low, 'high': high, 'expected': None,
+                   'rejection_rate': None, 'rejection_low': None, 'rejection_high': None, 'dof': None}
+
+        distribution = for_callback(self.callback)
+        if distribution is not None:
+            expected = expected_frequencies(bin_edges, self.n, distribution.cdf, self.ndigits, **self.kwargs)
+            _, merged_expected, groups = merge_bins(np.zeros(len(expected)), expected)
+            merged_observed = counts @ (groups[:, None] == np.arange(len(merged_expected))).astype(np.float64)
+            statistics = np.sum((merged_observed - merged_expected) ** 2 / merged_expected, axis=1)
+            dof = len(merged_expected) - 1
+            rejected = np.array([chi_square_sf(float(statistic), dof) < self.alpha for statistic in statistics])
+
+            rate = float(rejected.mean())
+            half = NormalDist().inv_cdf((1 + self.confidence) / 2) * math.sqrt(rate * (1 - rate) / len(rejected))
+            summary.update(expected=expected, rejection_rate=rate, rejection_low=max(rate - half, 0.0),
+                           rejection_high=min(rate + half, 1.0), dof=dof)
+
+        self._summaries[bins] = summary
+        return summary
+
+    def moments(self) -> dict:
+        """Mean of the sample means and of the sample variances, each with its confidence interval."""
+        mean = mean_interval(self.means, self.confidence)
+        variance = mean_interval(self.variances, self.confidence)
+        return {
+            'mean': float(mean[0]), 'mean_low': float(mean[1]), 'mean_high': float(mean[2]),
+            'variance': float(variance[0]), 'variance_low': float(variance[1]), 'variance_high': float(variance[2]),
+        }
+
+
+def run_replications(replications: int, n: int, callback, ndigits: int = -1, seed: int | None = None, kind: str = 'numpy',
+                     alpha: float = 0.05, confidence: float = 0.95, workers: int | None = None, progress=None,
+                     cancelled=None, **kwargs) -> ReplicationResult:
+    """Generates `replications` independent samples of n values and keeps what the summaries need.
+
+    Every replication draws from its own stream spawned from the seed, so the result only depends
+    on (seed, kind) and not on the number of workers. The replications are split in groups over a
+    process pool, or run in this process when the whole run is too small to pay for it.
+
+    Args:
+        replications (int): The number of samples R, at least 2.
+        n (int): The size of every sample.
+        callback (function): The scalar generator of the distribution, it must be in the registry.
+        ndigits (int, optional): The number of decimal places to round the samples. Defaults to -1.
+        seed (int | None, optional): The root seed. Defaults to None, which draws a fresh seed.
+        kind (str, optional): The generator kind passed to rng.make_rng. Defaults to 'numpy'.
+        alpha (float, optional): The significance level of the chi-square tests. Defaults to 0.05.
+        confidence (float, optional): The level of the confidence intervals. Defaults to 0.95.
+        workers (int | None, optional): The number of processes. Defaults to the CPU count.
+        progress (function, optional): Called as progress(done, replications) after every group. Defaults to None.
+        cancelled (function, optional): Checked between groups, GenerationCancelled is raised when it
+            returns True. Defaults to None.
+
+    Returns:
+        ReplicationResult: The counts and moments of every replication.
+    """
+    if replications < 2:
+        raise ValueError('Se necesitan al menos 2 réplicas.')
+    distribution = for_callback(callback)
+    if distribution is None:
+        raise ValueError('La distribución no está registrada.')
+
+    workers = workers or default_workers()
+    seed = seed if seed is not None else new_seed()
+    low, high = distribution.stream_range(n, **kwargs)
+    seed_sequences = np.random.SeedSequence(seed).spawn(replications)
+
+    # A few groups per worker, so progress moves and the last group does not leave the pool idle.
+    group_count = min(replications, workers * 4)
+    bounds = np.round(np.linspace(0, replications, group_count + 1)).astype(np.int64)
+    groups = [(int(bounds[i]), int(bounds[i + 1])) for i in range(group_count)]
+
+    counts = np.empty((replications, STREAM_FINE_BINS), dtype=np.int64)
+    means = np.empty(replications)
+    variances = np.empty(replications)
+
+    def store(group: tuple[int, int], result, done: int) -> int:
+        start, stop = group
+        counts[start:stop], means[start:stop], variances[start:stop] = result
+        done += stop - start
+        if progress is not None:
+            progress(done, replications)
+        return done
+
+    done = 0
+    if workers == 1 or replications * n < PARALLEL_MIN_CHUNK_SIZE * 2:
+        for start, stop in groups:
+            if cancelled is not None and cancelled():
+                raise GenerationCancelled()
+            result = _replicate(seed_sequences[start:stop], n, callback, ndigits, kind, low, high, kwargs)
+            done = store((start, stop), result, done)
+    else:
+        # Spawned rather than forked children, the parent may be running Qt threads.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(_replicate, seed_sequences[start:stop], n, callback, ndigits, kind, low, high, kwargs): (start, stop)
+                for start, stop in groups
+            }
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise GenerationCancelled()
+                done = store(futures[future], future.result(), done)
+
+    bin_edges = np.linspace(low, high if high > low else low + 1.0, STREAM_FINE_BINS + 1)
+    return ReplicationResult(n, callback, kwargs, bin_edges, counts, means, variances, alpha, confidence, ndigits)
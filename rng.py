@@ -0,0 +1,127 @@
+import numpy as np
+
+
+LCG_BLOCK_SIZE = 65_536
+
+
+class LinearCongruentialGenerator:
+    """Vectorized linear congruential generator x(i+1) = (a * x(i) + c) mod m.
+
+    The stream is produced in blocks: the jump-ahead coefficients a^k mod m and
+    c * (a^k - 1) / (a - 1) mod m are precomputed for k = 1..LCG_BLOCK_SIZE, so a whole
+    block is a single multiply-add over an array instead of a Python loop. The modulus must
+    not exceed 2^32 so that every product fits in an unsigned 64-bit integer.
+
+    It exposes the same random()/spawn() interface as numpy.random.Generator, so any
+    sampler in generators.py can draw from either one.
+    """
+
+    def __init__(self, seed, a: int, c: int, m: int):
+        if not 1 < m <= 2**32:
+            raise ValueError('The modulus must be between 2 and 2^32.')
+
+        self.a = a % m
+        self.c = c % m
+        self.m = m
+
+        if isinstance(seed, np.random.SeedSequence):
+            self._seed_sequence = seed
+            state = int(seed.generate_state(1, np.uint64)[0]) % m
+            if self.c == 0 and state == 0:
+                state = 1
+        else:
+            self._seed_sequence = np.random.SeedSequence(seed)
+            state = int(seed) % m
+
+        if self.c == 0 and state == 0:
+            raise ValueError('The seed of a multiplicative generator must not be a multiple of m.')
+
+        self.state = state
+        self._multipliers, self._increments = self._jump_tables(LCG_BLOCK_SIZE)
+
+    def _jump_tables(self, size: int):
+        multipliers = np.array([1], dtype=np.uint64)
+        increments = np.array([0], dtype=np.uint64)
+
+        while len(multipliers) <= size:
+            step_multiplier = int(multipliers[-1]) * self.a % self.m
+            step_increment = (int(increments[-1]) * self.a + self.c) % self.m
+            multipliers = np.concatenate((multipliers, multipliers * np.uint64(step_multiplier) % np.uint64(self.m)))
+            increments = np.concatenate((increments, (multipliers[:len(increments)] * np.uint64(step_increment) + increments) % np.uint64(self.m)))
+
+        return multipliers[1:size + 1], increments[1:size + 1]
+
+    def integers(self, n: int) -> np.ndarray:
+        """Returns the next n raw states of the generator."""
+        out = np.empty(n, dtype=np.uint64)
+        m = np.uint64(self.m)
+
+        for start in range(0, n, LCG_BLOCK_SIZE):
+            size = min(LCG_BLOCK_SIZE, n - start)
+            block = (self._multipliers[:size] * np.uint64(self.state) + self._increments[:size]) % m
+            out[start:start + size] = block
+            self.state = int(block[-1])
+
+        return out
+
+    def random(self, size=None):
+        """Returns uniform numbers in [0, 1) with the same semantics as Generator.random."""
+        if size is None:
+            return float(self.integers(1)[0]) / self.m
+
+        shape = (size,) if isinstance(size, int) else tuple(size)
+        return (self.integers(int(np.prod(shape))) / self.m).reshape(shape)
+
+    def spawn(self, n_children: int) -> list:
+        """Returns independent child generators with the same constants and derived seeds."""
+        return [LinearCongruentialGenerator(child, self.a, self.c, self.m) for child in self._seed_sequence.spawn(n_children)]
+
+
+class MixedLinearCongruentialGenerator(LinearCongruentialGenerator):
+    """Mixed LCG with the Numerical Recipes constants a = 1664525, c = 1013904223, m = 2^32."""
+
+    def __init__(self, seed):
+        super().__init__(seed, a=1_664_525, c=1_013_904_223, m=2**32)
+
+
+class MultiplicativeLinearCongruentialGenerator(LinearCongruentialGenerator):
+    """Multiplicative LCG with the Park-Miller constants a = 16807, m = 2^31 - 1."""
+
+    def __init__(self, seed):
+        super().__init__(seed, a=16_807, c=0, m=2**31 - 1)
+
+
+RNG_KINDS = {
+    'numpy': 'NumPy (PCG64)',
+    'lcg_mixed': 'Congruencial mixto',
+    'lcg_multiplicative': 'Congruencial multiplicativo',
+}
+
+
+def new_seed() -> int:
+    """Returns a fresh 32-bit seed taken from the OS entropy pool."""
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def make_rng(seed=None, kind: str = 'numpy'):
+    """Creates a random number generator of the given kind.
+
+    Args:
+        seed (int | np.random.SeedSequence | None, optional): The seed of the stream. Defaults to None,
+            which draws a fresh seed.
+        kind (str, optional): One of the keys of RNG_KINDS. Defaults to 'numpy'.
+
+    Returns:
+        np.random.Generator | LinearCongruentialGenerator: An object exposing random(size) and spawn(n).
+    """
+    if seed is None:
+        seed = new_seed()
+
+    if kind == 'numpy':
+        return np.random.Generator(np.random.PCG64(seed))
+    if kind == 'lcg_mixed':
+        return MixedLinearCongruentialGenerator(seed)
+    if kind == 'lcg_multiplicative':
+        return MultiplicativeLinearCongruentialGenerator(seed)
+
+    raise ValueError(f'Unknown generator kind: {kind}')
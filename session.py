@@ -0,0 +1,200 @@
+"""Session files: a sample set saved as .npy with a JSON sidecar describing how it was generated.
+
+The values are written in their stored format (see storage.SampleBuffer) and reopened with
+np.load(mmap_mode='r'), so even a file of 10^8 values opens at once and only the pages the table,
+histogram or moments read are loaded. The sidecar, next to the .npy with the same name and a .json
+extension, keeps the distribution, parameters, seed, generator and intervals of the run.
+
+CSV/TSV files written by other tools (or by the export of the tables) can be opened too; they are
+read in chunks of rows by read_delimited.
+"""
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+from distributions import DISTRIBUTIONS
+from storage import SampleBuffer
+
+
+SESSION_FORMAT = 'tp2-session'
+SESSION_VERSION = 1
+IMPORT_CHUNK_ROWS = 1_000_000
+# Opened samples up to this size are sorted for exact histograms and the K-S test, as generated
+# ones are; larger ones are binned in chunks so the memory map is never copied whole.
+SESSION_SORT_LIMIT = int(os.environ.get('TP2_SESSION_SORT_LIMIT', 10_000_000))
+DELIMITED_EXTENSIONS = ('.csv', '.tsv', '.txt')
+SNIFF_LINES = 100
+# One number with a decimal comma per line, e.g. "-0,1234" or "1,5e-05", as the copy of the tables writes them.
+DECIMAL_COMMA_LINE = re.compile(r'^\s*"?[-+]?\d+(,\d+)?([eE][-+]?\d+)?"?\s*$')
+
+
+class Session:
+    """An opened sample set and the metadata of its sidecar (empty for a plain .npy or an imported file)."""
+
+    def __init__(self, data: SampleBuffer, meta: dict, path: str | None = None):
+        self.data = data
+        self.meta = meta
+        self.path = path
+
+    @property
+    def distribution(self):
+        """The registered distribution the sample was generated from, or None when unknown."""
+        return DISTRIBUTIONS.get(self.meta.get('distribution'))  # type: ignore
+
+    @property
+    def params(self) -> dict:
+        return self.meta.get('params') or {}
+
+
+def sidecar_path(path: str) -> str:
+    return os.path.splitext(path)[0] + '.json'
+
+
+def write_sidecar(path: str, data: SampleBuffer, **meta):
+    """Writes the JSON sidecar of the .npy file at `path`.
+
+    Args:
+        path (str): The .npy file the sidecar describes.
+        data (SampleBuffer): The sample stored in it, for its length and format.
+        **meta: The run that produced it, e.g. distribution, params, n, seed, rng and intervals.
+    """
+    sidecar = {
+        **meta,
+        'format': SESSION_FORMAT,
+        'version': SESSION_VERSION,
+        'length': len(data),
+        'dtype': str(data.raw.dtype),
+        'scale': data.scale,
+        'ndigits': data.ndigits,
+    }
+    with open(sidecar_path(path), 'w', encoding='utf-8') as f:
+        json.dump(sidecar, f, indent=2)
+
+
+def save_session(path: str, data: SampleBuffer, **meta) -> str:
+    """Saves a sample set as .npy plus its JSON sidecar and returns the path of the .npy.
+
+    A sample that is already a memory map of that same file (e.g. a reopened session) is not
+    rewritten, only its sidecar.
+    """
+    if not path.lower().endswith('.npy'):
+        path += '.npy'
+
+    same_file = (isinstance(data.raw, np.memmap) and data.raw.filename is not None and os.path.exists(path)
+                 and os.path.samefile(data.raw.filename, path))
+    if not same_file:
+        np.save(path, data.raw)
+    write_sidecar(path, data, **meta)
+    return path
+
+
+def open_session(path: str) -> Session:
+    """Opens a session .npy as a read-only memory map, or imports a CSV/TSV file.
+
+    Raises:
+        ValueError: With a message for the user when the file can not be read as a sample.
+    """
+    if path.lower().endswith(DELIMITED_EXTENSIONS):
+        values = read_delimited(path)
+        return Session(SampleBuffer(values), {'source': os.path.basename(path), 'n': len(values)}, path)
+
+    if not path.lower().endswith('.npy'):
+        raise ValueError(f'Formato de archivo no soportado: {os.path.basename(path)}.')
+
+    meta = {}
+    if os.path.exists(sidecar_path(path)):
+        with open(sidecar_path(path), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('format') != SESSION_FORMAT:
+            meta = {}
+
+    try:
+        raw = np.load(path, mmap_mode='r')
+    except (OSError, ValueError) as e:
+        raise ValueError(f'No se pudo abrir {os.path.basename(path)}: {e}') from None
+    if raw.ndim != 1 or raw.dtype.kind not in 'fi':
+        raise ValueError(f'{os.path.basename(path)} no contiene una muestra de valores numéricos.')
+    if meta and (meta.get('length') != len(raw) or meta.get('dtype') != str(raw.dtype)):
+        raise ValueError(f'El archivo {os.path.basename(sidecar_path(path))} no corresponde a {os.path.basename(path)}.')
+
+    return Session(SampleBuffer(raw, meta.get('scale', 1), meta.get('ndigits', -1)), meta, path)
+
+
+def sniff_delimited(lines: list[str]) -> tuple[str, str, bool]:
+    """Guesses the separator, the decimal separator and whether there is a header from the first lines.
+
+    Tabs win over semicolons and semicolons over commas. A first line without any of them is a
+    single column, and so is a file whose lines all hold one number with a decimal comma (see
+    DECIMAL_COMMA_LINE). Unless commas separate the columns, values with a comma between digits use
+    it as decimal separator, as Excel writes them.
+
+    Raises:
+        ValueError: When commas separate the columns but the lines have different numbers of them,
+            so some commas may be decimal separators.
+
+    Returns:
+        tuple[str, str, bool]: (sep, decimal, header).
+    """
+    lines = [line.rstrip('\r\n') for line in lines if line.strip()]
+    line = lines[0]
+    if '\t' in line:
+        sep = '\t'
+    elif ';' in line:
+        sep = ';'
+    elif ',' in line and not all(DECIMAL_COMMA_LINE.match(text) for text in lines):
+        sep = ','
+    else:
+        sep = '\t'
+    decimal = ',' if sep != ',' and any(re.search(r'\d,\d', text) for text in lines) else '.'
+
+    first = line.split(sep)[0].strip().strip('"')
+    try:
+        float(first.replace(decimal, '.'))
+        header = False
+    except ValueError:
+        header = True
+
+    if sep == ',' and len({len(fields) for fields in csv.reader(lines[1:] if header else lines)}) > 1:
+        raise ValueError('No se puede saber si las comas separan columnas o decimales: las filas tienen distinta '
+                         'cantidad de comas. Use punto decimal o separe las columnas con tabulaciones o punto y coma.')
+    return sep, decimal, header
+
+
+def read_delimited(path: str, column: int = 0, chunk_rows: int = IMPORT_CHUNK_ROWS) -> np.ndarray:
+    """Reads one column of a CSV/TSV file as float64, chunk_rows rows at a time.
+
+    Empty cells are skipped. The separators and the header are detected by sniff_delimited from
+    the first SNIFF_LINES lines.
+
+    Raises:
+        ValueError: When the file is empty, its separators are ambiguous or the column has values
+            that are not numbers.
+    """
+    import pandas as pd
+
+    with open(path, encoding='utf-8-sig') as f:
+        lines = [line for _, line in zip(range(SNIFF_LINES), f) if line.strip()]
+    if not lines:
+        raise ValueError(f'El archivo {os.path.basename(path)} está vacío.')
+    try:
+        sep, decimal, header = sniff_delimited(lines)
+    except ValueError as e:
+        raise ValueError(f'{os.path.basename(path)}: {e}') from None
+
+    chunks = []
+    try:
+        reader = pd.read_csv(path, sep=sep, decimal=decimal, header=0 if header else None, usecols=[column],
+                             dtype='float64', chunksize=chunk_rows, encoding='utf-8-sig')
+        for frame in reader:
+            values = frame.iloc[:, 0].to_numpy()
+            chunks.append(values[~np.isnan(values)])
+    except ValueError:
+        raise ValueError(f'La columna {column + 1} de {os.path.basename(path)} tiene valores que no son números.') from None
+
+    values = np.concatenate(chunks) if chunks else np.empty(0)
+    if len(values) == 0:
+        raise ValueError(f'El archivo {os.path.basename(path)} no tiene valores.')
+    return values
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+import time
+
+
+class StartupProfiler:
+    """Wall-clock marks from process start to the first usable window."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.marks = []
+
+    def mark(self, label: str):
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self) -> str:
+        lines = ['Startup timing (ms):']
+        previous = self.start
+        for label, moment in self.marks:
+            lines.append(f'  {label:<32} +{(moment - previous) * 1000:8.1f}  total {(moment - self.start) * 1000:8.1f}')
+            previous = moment
+        return '\n'.join(lines)
+
+
+def import_breakdown(module: str, top: int = 15) -> list[tuple[str, int, int]]:
+    """Imports `module` in a fresh interpreter under -X importtime and returns its slowest imports.
+
+    Returns:
+        list[tuple[str, int, int]]: (module name, self time, cumulative time) in microseconds, sorted by
+            cumulative time. Empty in a frozen build, where -X options are not available.
+    """
+    if getattr(sys, 'frozen', False):
+        return []
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True, text=True
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+
+    return sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+
+
+def format_import_breakdown(entries: list[tuple[str, int, int]]) -> str:
+    lines = ['Slowest imports (ms, cumulative / self):']
+    for name, self_us, cumulative_us in entries:
+        lines.append(f'  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name}')
+    return '\n'.join(lines)
@@ -0,0 +1,119 @@
+import numpy as np
+
+
+STORAGE_FORMATS = {
+    'float64': 'Float64 (8 bytes por valor)',
+    'float32': 'Float32 (4 bytes por valor)',
+    'fixed32': 'Punto fijo int32 (4 bytes por valor)',
+}
+
+STORAGE_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32,
+    'fixed32': np.int32,
+}
+
+
+def storage_scale(storage: str, ndigits: int) -> int:
+    """The factor between the real values and the stored ones: 10^ndigits for fixed point, 1 otherwise."""
+    if storage != 'fixed32':
+        return 1
+    if ndigits < 0:
+        raise ValueError('El formato de punto fijo necesita una cantidad de decimales.')
+    return 10 ** ndigits
+
+
+def grid_ceil(x, ndigits: int) -> np.ndarray:
+    """The smallest k with k / 10^ndigits >= x, for every x.
+
+    k / 10^ndigits is how np.round leaves a value rounded to ndigits decimals, so this is the first
+    rounded value that is not below x, decided with the same float comparison the binning does.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    power = 10.0 ** ndigits
+    k = np.ceil(x * power)
+    k -= (k - 1) / power >= x
+    k += k / power < x
+    return k
+
+
+def encode(values: np.ndarray, storage: str, ndigits: int) -> np.ndarray:
+    """Converts float64 values to the stored representation in one vectorized pass.
+
+    Raises:
+        ValueError: When a value does not fit in 32-bit fixed point with ndigits decimals.
+    """
+    if storage == 'float64':
+        return values
+    if storage == 'float32':
+        return values.astype(np.float32)
+
+    scaled = np.rint(values * storage_scale(storage, ndigits))
+    limits = np.iinfo(np.int32)
+    if len(scaled) and (scaled.min() < limits.min or scaled.max() > limits.max):
+        raise ValueError(f'Los valores no entran en punto fijo de 32 bits con {ndigits} decimales.')
+    return scaled.astype(np.int32)
+
+
+class SampleBuffer:
+    """A sample kept in its compact stored form (float64, float32 or int32 fixed point).
+
+    Indexing returns float64 values of the requested slice only, so tables, exports and tests
+    decode what they touch instead of keeping a second full-precision copy. Code that can work
+    on the stored values directly, like binning, uses `raw` and `scale`.
+    """
+
+    def __init__(self, raw: np.ndarray, scale: int = 1, ndigits: int = -1):
+        self.raw = raw
+        self.scale = scale
+        self.ndigits = ndigits
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, storage: str = 'float64', ndigits: int = -1) -> 'SampleBuffer':
+        return cls(encode(values, storage, ndigits), storage_scale(storage, ndigits), ndigits)
+
+    @property
+    def storage(self) -> str:
+        if self.raw.dtype == np.int32:
+            return 'fixed32'
+        return 'float32' if self.raw.dtype == np.float32 else 'float64'
+
+    @property
+    def nbytes(self) -> int:
+        return self.raw.nbytes
+
+    @property
+    def shape(self) -> tuple:
+        return self.raw.shape
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def decode(self, raw: np.ndarray) -> np.ndarray:
+        """Turns stored values into float64, rounded back to ndigits for float32."""
+        if self.scale != 1:
+            return raw / self.scale
+        if raw.dtype == np.float32:
+            values = raw.astype(np.float64)
+            return np.round(values, self.ndigits) if self.ndigits >= 0 else values
+        return raw
+
+    def __getitem__(self, key) -> np.ndarray:
+        return self.decode(self.raw[key])
+
+    def values(self) -> np.ndarray:
+        """All values as float64. For float64 storage this is the stored array itself, not a copy."""
+        return self.decode(self.raw)
+
+    def reshape(self, *shape) -> 'SampleBuffer':
+        return SampleBuffer(self.raw.reshape(*shape), self.scale, self.ndigits)
+
+    def min(self) -> float:
+        return float(self.raw.min()) / self.scale
+
+    def max(self) -> float:
+        return float(self.raw.max()) / self.scale
+
+    def sorted(self) -> np.ndarray:
+        """The values sorted, in float64; the sort runs on the stored values."""
+        return self.decode(np.sort(self.raw))
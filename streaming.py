@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+
+from distributions import for_callback
+from generators import generate_random_variable_distribution
+from parallel import GenerationCancelled
+from rng import make_rng
+from storage import STORAGE_DTYPES, encode
+
+
+STREAM_CHUNK_SIZE = 1_000_000
+# Least common multiple of 5, 10, 15, 20 and 25, so the usual interval counts are an exact
+# regrouping of the fine bins.
+STREAM_FINE_BINS = 300
+
+
+class RunningStats:
+    """Count, mean, variance, minimum and maximum of a stream, updated one chunk at a time.
+
+    Chunks are merged with the parallel form of Welford's algorithm (Chan et al.), which keeps
+    the variance numerically stable without storing the values.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, chunk: np.ndarray):
+        if len(chunk) == 0:
+            return
+
+        count = len(chunk)
+        mean = float(chunk.mean())
+        m2 = float(((chunk - mean) ** 2).sum())
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+
+    @classmethod
+    def from_buffer(cls, buffer, chunk_size: int = STREAM_CHUNK_SIZE) -> 'RunningStats':
+        """The moments of a whole stored sample, decoding one chunk at a time."""
+        stats = cls()
+        for start in range(0, len(buffer), chunk_size):
+            stats.update(buffer[start:start + chunk_size])
+        return stats
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class StreamingHistogram:
+    """Frequency counts over fixed edges, accumulated one chunk at a time.
+
+    Values outside [low, high] are counted in the first or last bin, and how many there were is
+    kept in `outside`.
+    """
+
+    def __init__(self, low: float, high: float, bins: int = STREAM_FINE_BINS):
+        if not low < high:
+            high = low + 1.0
+
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.bin_edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.outside = 0
+
+    def update(self, chunk: np.ndarray):
+        index = np.floor((chunk - self.low) * (self.bins / (self.high - self.low))).astype(np.int64)
+        # The upper edge is closed, as in np.histogram, so high falls in the last bin after clipping.
+        np.clip(index, 0, self.bins - 1, out=index)
+        # Rounding can put a value lying on an edge (e.g. an integer one) one bin off, so the index
+        # is corrected against the edges themselves, as np.histogram does.
+        index -= (chunk < self.bin_edges[index]) & (index > 0)
+        index += (chunk >= self.bin_edges[index + 1]) & (index < self.bins - 1)
+        self.outside += int(((chunk < self.low) | (chunk > self.high)).sum())
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    def histogram(self, bins: int) -> tuple[np.ndarray, np.ndarray]:
+        """Regroups the fine bins into `bins` intervals.
+
+        When `bins` does not divide the number of fine bins, every interval boundary is moved to the
+        nearest fine edge, so the counts stay exact and the widths differ by at most one fine bin.
+        """
+        bins = min(bins, self.bins)
+        boundaries = np.round(np.linspace(0, self.bins, bins + 1)).astype(np.int64)
+        return np.add.reduceat(self.counts, boundaries[:-1]), self.bin_edges[boundaries]
+
+
+def stream_range(n: int, callback, **kwargs) -> tuple[float, float]:
+    """Returns fixed histogram bounds for a streamed run, see Distribution.stream_range."""
+    distribution = for_callback(callback)
+    if distribution is None:
+        raise ValueError('No hay un rango de histograma conocido para esta distribución.')
+    return distribution.stream_range(n, **kwargs)
+
+
+def iter_chunks(n: int, callback, ndigits: int = -1, rng=None, chunk_size: int = STREAM_CHUNK_SIZE, **kwargs):
+    """Yields the n samples of a run in arrays of at most chunk_size values, drawn from one stream."""
+    rng = rng if rng is not None else make_rng()
+    for start in range(0, n, chunk_size):
+        yield generate_random_variable_distribution(min(chunk_size, n - start), callback, ndigits, rng=rng, **kwargs)
+
+
+class StreamResult:
+    def __init__(self, histogram: StreamingHistogram, stats: RunningStats, data: np.ndarray | None):
+        self.histogram = histogram
+        self.stats = stats
+        self.data = data
+
+
+def generate_stream(n: int, callback, ndigits: int = -1, rng=None, chunk_size: int = STREAM_CHUNK_SIZE,
+                    spill_path: str | None = None, on_chunk=None, cancelled=None, storage: str = 'float64',
+                    **kwargs) -> StreamResult:
+    """Generates n samples chunk by chunk, keeping only the histogram and the running moments.
+
+    Args:
+        n (int): The number of samples to generate.
+        callback (function): The scalar generator of the distribution (see BATCH_GENERATORS).
+        ndigits (int, optional): The number of decimal places to round the samples. Defaults to -1.
+        rng (optional): The generator to draw from. Defaults to None, which uses a freshly seeded stream.
+        chunk_size (int, optional): The number of samples per chunk. Defaults to STREAM_CHUNK_SIZE.
+        spill_path (str | None, optional): A .npy file the raw values are written to through a memory
+            map. Defaults to None, which discards them.
+        on_chunk (function, optional): Called as on_chunk(done, n, histogram, stats) after every chunk.
+            Defaults to None.
+        cancelled (function, optional): Checked before every chunk, GenerationCancelled is raised when
+            it returns True. Defaults to None.
+        storage (str, optional): The format of the spilled values, one of storage.STORAGE_FORMATS.
+            Defaults to 'float64'.
+
+    Returns:
+        StreamResult: The histogram, the running moments and the memory-mapped values, if spilled.
+    """
+    histogram = StreamingHistogram(*stream_range(n, callback, **kwargs))
+    stats = RunningStats()
+    data = np.lib.format.open_memmap(spill_path, mode='w+', dtype=STORAGE_DTYPES[storage], shape=(n,)) if spill_path else None
+
+    done = 0
+    for chunk in iter_chunks(n, callback, ndigits, rng, chunk_size, **kwargs):
+        if cancelled is not None and cancelled():
+            raise GenerationCancelled()
+
+        histogram.update(chunk)
+        stats.update(chunk)
+        if data is not None:
+            data[done:done + len(chunk)] = encode(chunk, storage, ndigits)
+        done += len(chunk)
+
+        if on_chunk is not None:
+            on_chunk(done, n, histogram, stats)
+
+    if data is not None:
+        data.flush()
+
+    return StreamResult(histogram, stats, data)
@@ -0,0 +1,6 @@
+from app import DISTRIBUTION_TABS
+from distributions import DISTRIBUTIONS
+
+
+def test_distribution_tabs_follow_the_registry():
+    assert DISTRIBUTION_TABS == [(distribution.name, distribution.label) for distribution in DISTRIBUTIONS.values()]
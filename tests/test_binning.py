@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from binning import Binning
+from generators import generate_random_variable_distribution, normal_distribution_generator_box_muller
+from rng import make_rng
+from storage import STORAGE_FORMATS, SampleBuffer
+
+
+@pytest.mark.parametrize('storage', list(STORAGE_FORMATS))
+@pytest.mark.parametrize('seed', range(20))
+def test_histogram_counts_every_value(storage, seed):
+    values = generate_random_variable_distribution(
+        10_000, normal_distribution_generator_box_muller, 4, rng=make_rng(seed), mu=0.0, sigma=1.0
+    )
+    binning = Binning(SampleBuffer.from_values(values, storage, 4))
+    for bins in (5, 10, 17):
+        counts, bin_edges = binning.histogram(bins)
+        assert counts.sum() == len(values)
+        assert len(bin_edges) == bins + 1
+
+
+@pytest.mark.parametrize('storage', list(STORAGE_FORMATS))
+def test_histogram_matches_across_storage(storage):
+    values = generate_random_variable_distribution(
+        10_000, normal_distribution_generator_box_muller, 3, rng=make_rng(7), mu=0.0, sigma=1.0
+    )
+    expected, _ = Binning(SampleBuffer.from_values(values, 'float64', 3)).histogram(10)
+    counts, _ = Binning(SampleBuffer.from_values(values, storage, 3)).histogram(10)
+    assert np.array_equal(counts, expected)
@@ -0,0 +1,14 @@
+import pytest
+
+from components import parse_seed
+
+
+@pytest.mark.parametrize('text, seed', [('', None), ('  ', None), ('0', 0), ('42', 42), (' 7 ', 7)])
+def test_parse_seed(text, seed):
+    assert parse_seed(text) == seed
+
+
+@pytest.mark.parametrize('text', ['-1', '5-', '--5', '1.5', 'abc', '²'])
+def test_parse_seed_rejects(text):
+    with pytest.raises(ValueError, match='semilla'):
+        parse_seed(text)
@@ -0,0 +1,25 @@
+import pytest
+
+from distributions import DISTRIBUTIONS
+
+
+@pytest.mark.parametrize('name, params', [
+    ('lognormal', {'mu': '0', 'sigma': '30'}),
+    ('lognormal', {'mu': '400', 'sigma': '1'}),
+    ('normal', {'mu': '0', 'sigma': '1e200'}),
+    ('exponential', {'lamb': '1e-200'}),
+    ('poisson', {'lamb': '1e9'}),
+])
+def test_parse_rejects_unrepresentable_moments(name, params):
+    with pytest.raises(ValueError):
+        DISTRIBUTIONS[name].parse(params)
+
+
+@pytest.mark.parametrize('name, params', [
+    ('lognormal', {'mu': '0', 'sigma': '10'}),
+    ('poisson', {'lamb': '500000'}),
+])
+def test_parse_accepts_large_parameters(name, params):
+    distribution = DISTRIBUTIONS[name]
+    low, high = distribution.stream_range(1000, **distribution.parse(params))
+    assert low < high
@@ -1,12 +1,24 @@
-import pandas as pd
-from PyQt5.QtCore import Qt, QAbstractTableModel
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from storage import SampleBuffer
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class PandasModel(QAbstractTableModel):
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: 'pd.DataFrame'):
         super().__init__()
         self._df = df
 
+    @property
+    def frame(self) -> 'pd.DataFrame':
+        return self._df
+
     def rowCount(self, parent=None):
         return len(self._df)
 
@@ -25,3 +37,78 @@ class PandasModel(QAbstractTableModel):
             if orientation == Qt.Vertical: # type: ignore
                 return str(self._df.index[section])
         return None
+
+
+class ArrayModel(QAbstractTableModel):
+    """Read-only model over a NumPy array or SampleBuffer that neither copies nor pre-formats it.
+
+    Rows are exposed to the view in pages through canFetchMore/fetchMore, and the text of a cell
+    is built only when the view asks for it and kept in a bounded LRU cache.
+    """
+
+    PAGE_SIZE = 10_000
+    CACHE_SIZE = 4_096
+
+    def __init__(self, array: 'np.ndarray | SampleBuffer', columns: list[str]):
+        super().__init__()
+        array = array if isinstance(array, SampleBuffer) else SampleBuffer(array)
+        self._array = array.reshape(-1, 1) if len(array.shape) == 1 else array
+        self._columns = columns
+        self._loaded = min(self.PAGE_SIZE, len(self._array))
+        self._cache = OrderedDict()
+
+    @property
+    def array(self) -> SampleBuffer:
+        return self._array
+
+    @property
+    def columns(self) -> list[str]:
+        return self._columns
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._array.shape[1]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._array)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        loaded = min(self._loaded + self.PAGE_SIZE, len(self._array))
+        self.beginInsertRows(QModelIndex(), self._loaded, loaded - 1)
+        self._loaded = loaded
+        self.endInsertRows()
+
+    def cell_text(self, row: int, column: int) -> str:
+        key = (row, column)
+        text = self._cache.get(key)
+        if text is not None:
+            self._cache.move_to_end(key)
+            return text
+
+        text = str(self._array[row, column].item())
+        self._cache[key] = text
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return text
+
+    def sample_texts(self, column: int, count: int) -> list[str]:
+        """Formats `count` rows spread evenly over the whole array, loaded or not."""
+        rows = np.unique(np.linspace(0, len(self._array) - 1, num=min(count, len(self._array)), dtype=np.int64))
+        return [str(value.item()) for value in self._array[rows, column]]
+
+    def data(self, index, role=Qt.DisplayRole): # type: ignore
+        if role == Qt.DisplayRole: # type: ignore
+            return self.cell_text(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole): # type: ignore
+        if role == Qt.DisplayRole: # type: ignore
+            if orientation == Qt.Horizontal: # type: ignore
+                return str(self._columns[section])
+            if orientation == Qt.Vertical: # type: ignore
+                return str(section)
+        return None
@@ -0,0 +1,270 @@
+import numpy as np
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from binning import Binning
+from distributions import for_callback
+from fit import ks_test
+from instrumentation import NULL_RUN
+from parallel import GenerationCancelled, generate_random_variable_distribution_chunked, generate_random_variable_distribution_parallel
+from randomness import assess
+from replication import run_replications
+from rng import make_rng
+from session import SESSION_SORT_LIMIT, open_session
+from storage import SampleBuffer, storage_scale
+from streaming import STREAM_CHUNK_SIZE, RunningStats, StreamingHistogram, generate_stream
+
+
+class GenerationResult:
+    """A sample with its histogram; ndigits, the decimals it was rounded to, defaults to the one of data."""
+
+    def __init__(self, data: SampleBuffer | None, counts: np.ndarray, bin_edges: np.ndarray, binning=None, stats=None, ks=None,
+                 ndigits: int | None = None):
+        self.data = data
+        self.ndigits = ndigits if ndigits is not None else data.ndigits if data is not None else -1
+        self.counts = counts
+        self.bin_edges = bin_edges
+        self.binning = binning
+        self.stats = stats
+        self.ks = ks
+
+
+class JobSignals(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    partial = pyqtSignal(int, object)
+
+
+class GenerationJob(QRunnable):
+    """Generates a sample, its histogram, moments and Kolmogorov-Smirnov test outside the GUI thread.
+
+    Every signal carries the job id, so the receiver can drop the results of a job that was
+    replaced by a newer one. cancel() only sets a flag, the job stops at the next chunk boundary.
+    The stages are timed into `metrics`, an instrumentation Run set by the caller (a no-op by default).
+    """
+
+    def __init__(self, job_id: int, n: int, callback, kwargs: dict, intervals: int, ndigits: int = 4,
+                 seed: int | None = None, kind: str = 'numpy', parallel: bool = False, workers: int = 1,
+                 storage: str = 'float64'):
+        super().__init__()
+        self.job_id = job_id
+        self.n = n
+        self.callback = callback
+        self.kwargs = kwargs
+        self.intervals = intervals
+        self.ndigits = ndigits
+        self.seed = seed
+        self.kind = kind
+        self.parallel = parallel
+        self.workers = workers
+        self.storage = storage
+
+        self.signals = JobSignals()
+        self.metrics = NULL_RUN
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def _report(self, done: int, total: int):
+        self.signals.progress.emit(self.job_id, int(100 * done / total) if total else 100)
+
+    def _generate(self) -> np.ndarray:
+        if self.parallel:
+            return generate_random_variable_distribution_parallel(
+                self.n, self.callback, self.ndigits, seed=self.seed, kind=self.kind, workers=self.workers,
+                progress=self._report, cancelled=self.is_cancelled, storage=self.storage, **self.kwargs
+            )
+
+        return generate_random_variable_distribution_chunked(
+            self.n, self.callback, self.ndigits, rng=make_rng(self.seed, self.kind),
+            progress=self._report, cancelled=self.is_cancelled, storage=self.storage, **self.kwargs
+        )
+
+    def run(self):
+        try:
+            with self.metrics.stage('generate'):
+                data = SampleBuffer(self._generate(), storage_scale(self.storage, self.ndigits), self.ndigits)
+            if self._cancelled:
+                return
+
+            with self.metrics.stage('histogram'):
+                binning = Binning(data)
+                counts, bin_edges = binning.histogram(self.intervals)
+            distribution = for_callback(self.callback)
+            ks = None
+            if distribution is not None and not distribution.discrete:
+                with self.metrics.stage('ks'):
+                    ks = ks_test(None, distribution.cdf, sorted_data=binning.sorted_values(), ndigits=data.ndigits, **self.kwargs)
+            with self.metrics.stage('moments'):
+                stats = RunningStats.from_buffer(data)
+        except GenerationCancelled:
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        self.signals.finished.emit(self.job_id, GenerationResult(data, counts, bin_edges, binning=binning, stats=stats, ks=ks))
+
+
+class StreamingJob(GenerationJob):
+    """Generates a sample in chunks keeping only its histogram and moments, see streaming.generate_stream.
+
+    After every chunk the partial histogram is sent through the `partial` signal, so the chart can
+    follow the run. When spill_path is set the values are also written to that .npy file and the
+    result carries them as a read-only memory map.
+    """
+
+    def __init__(self, job_id: int, n: int, callback, kwargs: dict, intervals: int, ndigits: int = 4,
+                 seed: int | None = None, kind: str = 'numpy', spill_path: str | None = None, storage: str = 'float64'):
+        super().__init__(job_id, n, callback, kwargs, intervals, ndigits, seed, kind, storage=storage)
+        self.spill_path = spill_path
+
+    def _on_chunk(self, done: int, total: int, histogram, stats):
+        self._report(done, total)
+        self.signals.partial.emit(self.job_id, GenerationResult(None, *histogram.histogram(self.intervals)))
+
+    def run(self):
+        try:
+            with self.metrics.stage('generate'):
+                stream = generate_stream(
+                    self.n, self.callback, self.ndigits, rng=make_rng(self.seed, self.kind), spill_path=self.spill_path,
+                    on_chunk=self._on_chunk, cancelled=self.is_cancelled, storage=self.storage, **self.kwargs
+                )
+            raw = np.load(self.spill_path, mmap_mode='r') if self.spill_path else np.empty(0)
+            data = SampleBuffer(raw, storage_scale(self.storage, self.ndigits), self.ndigits)
+            counts, bin_edges = stream.histogram.histogram(self.intervals)
+        except GenerationCancelled:
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        self.signals.finished.emit(self.job_id, GenerationResult(
+            data, counts, bin_edges, binning=stream.histogram, stats=stream.stats, ndigits=self.ndigits
+        ))
+
+
+class RandomnessJob(QRunnable):
+    """Runs the randomness test battery (see randomness.assess) outside the GUI thread."""
+
+    def __init__(self, job_id: int, n: int, seed: int | None = None, kind: str = 'numpy', alpha: float = 0.05):
+        super().__init__()
+        self.job_id = job_id
+        self.n = n
+        self.seed = seed
+        self.kind = kind
+        self.alpha = alpha
+        self.signals = JobSignals()
+        self.metrics = NULL_RUN
+
+    def run(self):
+        try:
+            with self.metrics.stage('tests'):
+                report = assess(self.n, self.seed, self.kind, self.alpha)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        self.signals.finished.emit(self.job_id, report)
+
+
+class ReplicationJob(GenerationJob):
+    """Runs R independent replications of a distribution (see replication.run_replications) outside the GUI thread."""
+
+    def __init__(self, job_id: int, replications: int, n: int, callback, kwargs: dict, intervals: int, ndigits: int = 4,
+                 seed: int | None = None, kind: str = 'numpy', workers: int = 1, alpha: float = 0.05):
+        super().__init__(job_id, n, callback, kwargs, intervals, ndigits, seed, kind, workers=workers)
+        self.replications = replications
+        self.alpha = alpha
+
+    def run(self):
+        try:
+            with self.metrics.stage('replicate'):
+                result = run_replications(
+                    self.replications, self.n, self.callback, self.ndigits, seed=self.seed, kind=self.kind, alpha=self.alpha,
+                    workers=self.workers, progress=self._report, cancelled=self.is_cancelled, **self.kwargs
+                )
+            with self.metrics.stage('summary'):
+                result.summary(self.intervals)
+        except GenerationCancelled:
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        self.signals.finished.emit(self.job_id, result)
+
+
+class SessionResult(GenerationResult):
+    """A reopened sample with the distribution it is tested against (None when unknown) and its parameters."""
+
+    def __init__(self, session, distribution, params: dict, counts: np.ndarray, bin_edges: np.ndarray, binning=None,
+                 stats=None, ks=None):
+        super().__init__(session.data, counts, bin_edges, binning=binning, stats=stats, ks=ks)
+        self.session = session
+        self.distribution = distribution
+        self.params = params
+
+
+class SessionJob(QRunnable):
+    """Opens a session file (or imports a CSV/TSV) and computes its histogram, moments and K-S test outside the GUI thread.
+
+    Samples of up to SESSION_SORT_LIMIT values are binned exactly, like a generated one. Larger ones
+    are read from the memory map in chunks into a StreamingHistogram between their minimum and
+    maximum. The fit is against the distribution of the sidecar or, when it has none, `fallback`.
+    """
+
+    def __init__(self, job_id: int, path: str, intervals: int, fallback: tuple | None = None):
+        super().__init__()
+        self.job_id = job_id
+        self.path = path
+        self.intervals = intervals
+        self.fallback = fallback
+        self.signals = JobSignals()
+        self.metrics = NULL_RUN
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            with self.metrics.stage('open'):
+                session = open_session(self.path)
+            distribution, params = self.fallback if self.fallback is not None else (None, {})
+            if session.distribution is not None:
+                distribution, params = session.distribution, session.distribution.parse(session.params)
+            intervals = int(session.meta.get('intervals', self.intervals))
+            data = session.data
+
+            with self.metrics.stage('moments'):
+                stats = RunningStats.from_buffer(data)
+            if self._cancelled:
+                return
+
+            ks = None
+            with self.metrics.stage('histogram'):
+                if len(data) <= SESSION_SORT_LIMIT:
+                    binning = Binning(data)
+                    counts, bin_edges = binning.histogram(intervals)
+                else:
+                    binning = StreamingHistogram(stats.min, stats.max)
+                    for start in range(0, len(data), STREAM_CHUNK_SIZE):
+                        if self._cancelled:
+                            return
+                        binning.update(data[start:start + STREAM_CHUNK_SIZE])
+                    counts, bin_edges = binning.histogram(intervals)
+            if isinstance(binning, Binning) and distribution is not None and not distribution.discrete:
+                with self.metrics.stage('ks'):
+                    ks = ks_test(None, distribution.cdf, sorted_data=binning.sorted_values(), ndigits=data.ndigits, **params)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+
+        self.signals.finished.emit(
+            self.job_id, SessionResult(session, distribution, params, counts, bin_edges, binning=binning, stats=stats, ks=ks)
+        )